@@ -0,0 +1,76 @@
+"""Report recall@k and latency of IVFIndex against exact VectorIndex search.
+
+The synthetic corpus mimics an FAQ sheet: many short paraphrases around a
+smaller number of topics, so rows form tight clusters. Queries are fresh
+paraphrases of random topics.
+
+Usage: python benchmarks/bench_ann_recall.py [--rows 100000] [--n-lists N] [--n-probe 1 4 8 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hcil_chatbot.vector_search import IVFIndex, VectorIndex, normalize_rows  # noqa: E402
+
+
+def make_corpus(rng, rows: int, dim: int, queries: int, rows_per_topic: int = 5, noise: float = 0.35):
+    """Generate clustered unit vectors and matching queries"""
+    topics = normalize_rows(rng.standard_normal((max(1, rows // rows_per_topic), dim)).astype(np.float32))
+    corpus = topics[rng.integers(0, len(topics), rows)] + noise * rng.standard_normal((rows, dim)) / np.sqrt(dim)
+    query_topics = topics[rng.integers(0, len(topics), queries)]
+    query_vectors = query_topics + noise * rng.standard_normal((queries, dim)) / np.sqrt(dim)
+    return normalize_rows(corpus.astype(np.float32)), normalize_rows(query_vectors.astype(np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--n-lists', type=int, default=None)
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    corpus, queries = make_corpus(rng, args.rows, args.dim, args.queries)
+    
+    exact = VectorIndex(corpus)
+    start = time.perf_counter()
+    exact_indices = [exact.search(query, args.top_k)[0] for query in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    start = time.perf_counter()
+    ivf = IVFIndex(corpus, n_lists=args.n_lists)
+    build_s = time.perf_counter() - start
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'index.ivf.npz')
+        ivf.save(path)
+        start = time.perf_counter()
+        IVFIndex.load(path, corpus)
+        load_ms = (time.perf_counter() - start) * 1000
+    
+    print(f"rows={args.rows} dim={args.dim} n_lists={ivf.n_lists} top_k={args.top_k}")
+    print(f"IVF build {build_s:.2f}s, load from disk {load_ms:.1f} ms")
+    print(f"exact search: {exact_ms:.3f} ms/query")
+    print(f"{'n_probe':>8} {'recall@k':>9} {'ms/query':>9} {'speedup':>8}")
+    for n_probe in args.n_probe:
+        ivf.n_probe = n_probe
+        start = time.perf_counter()
+        ivf_indices = [ivf.search(query, args.top_k)[0] for query in queries]
+        ivf_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([
+            len(set(a) & set(b)) / len(a) for a, b in zip(exact_indices, ivf_indices)
+        ])
+        print(f"{n_probe:>8} {recall:>9.3f} {ivf_ms:>9.3f} {exact_ms / ivf_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
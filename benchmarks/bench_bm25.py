@@ -0,0 +1,134 @@
+"""Check BM25Index against a direct BM25 computation and compare its latency with FuzzyIndex.
+
+The dataset's questions, answers and tags are indexed as the knowledge base
+indexes them. Every question is used as a query as is, with a dropped
+character and with half its words, plus a few free-text queries. Scores are
+checked against BM25 computed term by term in plain Python; the script exits
+non-zero on any difference.
+
+Latency is then measured on the dataset repeated --scale times (each copy
+gets a distinct marker word, so rows stay distinct), since the lexical scan
+is what grows with the knowledge base.
+
+Usage: python benchmarks/bench_bm25.py [--dataset dataset.xlsx] [--top-k 3] [--scale 1 10 100]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot import config  # noqa: E402
+from hcil_chatbot.bm25_index import BM25Index, tokenize  # noqa: E402
+from hcil_chatbot.fuzzy_index import FuzzyIndex  # noqa: E402
+
+
+def make_queries(questions: List[str], seed: int = 0) -> List[str]:
+    """Build exact, typo'd and partial variants of the questions"""
+    rng = random.Random(seed)
+    queries = ["outlook not syncing on laptop", "printer", "vpn", "password reset for sap", "zzz"]
+    for question in questions:
+        queries.append(question)
+        cut = rng.randrange(len(question))
+        queries.append(question[:cut] + question[cut + 1:])
+        words = question.split()
+        queries.append(' '.join(rng.sample(words, max(1, len(words) // 2))))
+    return queries
+
+
+def reference_scores(fields: List[List[str]], weights: List[float], query: str, k1: float, b: float) -> np.ndarray:
+    """Score every row with weighted-field BM25, one term at a time"""
+    n_rows = len(fields[0])
+    frequencies = [Counter() for _ in range(n_rows)]
+    lengths = [0.0] * n_rows
+    for texts, weight in zip(fields, weights):
+        for row, text in enumerate(texts):
+            for term in tokenize(text):
+                frequencies[row][term] += weight
+                lengths[row] += weight
+    mean_length = sum(lengths) / n_rows
+    scores = np.zeros(n_rows)
+    for term in tokenize(query):
+        document_frequency = sum(1 for counts in frequencies if counts[term] > 0)
+        if not document_frequency:
+            continue
+        idf = math.log(1 + (n_rows - document_frequency + 0.5) / (document_frequency + 0.5))
+        for row, counts in enumerate(frequencies):
+            tf = counts[term]
+            if tf:
+                scores[row] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[row] / mean_length))
+    return scores
+
+
+def load_fields(dataset: str) -> Dict[str, List[str]]:
+    """Get the cleaned columns the knowledge base indexes"""
+    df = pd.read_excel(dataset).dropna(subset=['questions', 'answers'])
+    return {
+        'questions': df['questions'].astype(str).str.lower().str.strip().tolist(),
+        'answers': df['answers'].astype(str).str.strip().tolist(),
+        'tags': df['tags'].where(df['tags'].notna(), '').astype(str).tolist()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--scale', nargs='+', type=int, default=[1, 10, 100])
+    args = parser.parse_args()
+    
+    fields = load_fields(args.dataset)
+    names = ['questions', 'answers', 'tags']
+    weights = [config.BM25_FIELD_WEIGHTS.get(name, 0.0) for name in names]
+    queries = make_queries(fields['questions'])
+    
+    index = BM25Index([fields[name] for name in names], weights, k1=config.BM25_K1, b=config.BM25_B)
+    mismatches = 0
+    for query in queries:
+        scores, _ = index.scores(query)
+        expected = reference_scores([fields[name] for name in names], weights, query, config.BM25_K1, config.BM25_B)
+        if not np.allclose(scores, expected, rtol=1e-4, atol=1e-5):
+            mismatches += 1
+            print(f"MISMATCH {query!r}")
+    print(f"{len(queries)} queries checked against direct BM25: {mismatches} mismatches")
+    
+    print(f"{'rows':>8}{'bm25 build ms':>15}{'fuzzy build ms':>16}{'bm25 ms/query':>15}{'fuzzy ms/query':>16}{'speedup':>9}")
+    for scale in args.scale:
+        scaled = {name: [] for name in names}
+        for copy in range(scale):
+            for name in names:
+                marker = f" copy{copy}" if name == 'questions' and copy else ''
+                scaled[name].extend(text + marker for text in fields[name])
+        
+        start = time.perf_counter()
+        bm25_index = BM25Index([scaled[name] for name in names], weights, k1=config.BM25_K1, b=config.BM25_B)
+        bm25_build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        fuzzy_index = FuzzyIndex(scaled['questions'])
+        fuzzy_build_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        for query in queries:
+            bm25_index.search(query, args.top_k)
+        bm25_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        start = time.perf_counter()
+        for query in queries:
+            fuzzy_index.search(query, args.top_k)
+        fuzzy_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        
+        print(f"{len(scaled['questions']):>8}{bm25_build_ms:>15.0f}{fuzzy_build_ms:>16.0f}{bm25_ms:>15.3f}"
+              f"{fuzzy_ms:>16.3f}{fuzzy_ms / bm25_ms:>8.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
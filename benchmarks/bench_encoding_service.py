@@ -0,0 +1,83 @@
+"""Compare one-query-per-call encoding with BatchEncodingService under concurrent load.
+
+Each simulated session is a thread that sends queries back to back. The
+direct path calls model.encode([query]) from every thread, as the app did
+before; the batched path routes the same calls through the service.
+
+Usage: python benchmarks/bench_encoding_service.py [--model all-MiniLM-L6-v2] [--sessions 1 8 32]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hcil_chatbot.encoding_service import BatchEncodingService  # noqa: E402
+
+QUERIES = [
+    "how do i reset my password", "vpn keeps disconnecting", "outlook not syncing on laptop",
+    "printer shows offline", "sap transaction code error", "laptop battery drains fast",
+    "cannot install software", "wifi not connecting in meeting room", "account locked out",
+    "monitor not detected on dock"
+]
+
+
+def run_load(encode, sessions: int, queries_per_session: int):
+    """Run sessions concurrently and return (wall seconds, per-query latencies in ms)"""
+    latencies = [[] for _ in range(sessions)]
+    barrier = threading.Barrier(sessions + 1)
+    
+    def session(i: int):
+        barrier.wait()
+        for j in range(queries_per_session):
+            query = QUERIES[(i + j) % len(QUERIES)] + f" #{i}-{j}"
+            start = time.perf_counter()
+            encode([query])
+            latencies[i].append((time.perf_counter() - start) * 1000)
+    
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.concatenate([np.array(l) for l in latencies])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--queries', type=int, default=50, help='queries per session')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+    
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model)
+    model.encode(QUERIES)  # warm up
+    
+    service = BatchEncodingService(model, args.max_batch_size, args.max_wait_ms)
+    paths = {
+        'direct': lambda texts: model.encode(texts, show_progress_bar=False),
+        'batched': service.encode,
+    }
+    
+    print(f"{'sessions':>8} {'path':>8} {'q/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for sessions in args.sessions:
+        for name, encode in paths.items():
+            wall, latencies = run_load(encode, sessions, args.queries)
+            print(f"{sessions:>8} {name:>8} {len(latencies) / wall:>9.1f} "
+                  f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 99):>8.2f}")
+    stats = service.stats()
+    print(f"batched path: {stats['batches']} batches, mean batch size {stats['mean_batch_size']:.1f}")
+    service.close()
+
+
+if __name__ == '__main__':
+    main()
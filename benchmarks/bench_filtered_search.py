@@ -0,0 +1,106 @@
+"""Benchmark category and tag filtered search over row slices against post-filtering a full search.
+
+For every category and a sample of tags, typo'd questions from the matching
+rows are searched three ways:
+
+* slice: ``search(..., category=..., tags=...)``, which only scans the
+  matching rows through their own fuzzy and vector sub-indexes;
+* post-filter: a full search deep enough to hold --top-k matching rows,
+  filtered afterwards (the only way to filter without the slices);
+* brute force: every matching row scored directly, as the reference the
+  slice results are checked against.
+
+Usage: python benchmarks/bench_filtered_search.py [--dataset dataset.xlsx] [--queries 50] [--top-k 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot import EnhancedKnowledgeBase, load_model  # noqa: E402
+from hcil_chatbot.knowledge_base import filter_key  # noqa: E402
+
+
+def make_typo(text: str, rng: random.Random) -> str:
+    """Delete one character"""
+    position = rng.randrange(len(text))
+    return text[:position] + text[position + 1:]
+
+
+def time_ms(search: Callable[[str], List[Dict]], queries: List[str]) -> float:
+    """Get the mean milliseconds per query"""
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def post_filter(kb: EnhancedKnowledgeBase, query: str, method: str, top_k: int, rows: set) -> List[Dict]:
+    """Search everything, deepening until top_k results fall in the filtered rows"""
+    depth = top_k
+    while True:
+        results = [result for result in kb.search(query, method, depth) if result['index'] in rows]
+        if len(results) >= top_k or depth >= len(kb.questions):
+            return results[:top_k]
+        depth *= 4
+
+
+def brute_force_semantic(kb: EnhancedKnowledgeBase, query: str, top_k: int, rows: np.ndarray) -> np.ndarray:
+    """Score every filtered row against the query and return the best scores"""
+    scores = kb.index.embeddings[rows] @ kb._encode_query(query.lower().strip()).reshape(-1)
+    return np.sort(scores)[::-1][:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--tags', type=int, default=5, help='number of tags to benchmark, most frequent first')
+    args = parser.parse_args()
+    
+    kb = EnhancedKnowledgeBase(load_model())
+    if not kb.load_data(args.dataset):
+        sys.exit(f"Could not load {args.dataset}")
+    rng = random.Random(0)
+    
+    filters = [{'category': category} for category in kb.category_rows]
+    tags = sorted(kb.tag_rows, key=lambda tag: -len(kb.tag_rows[tag]))[:args.tags]
+    filters += [{'tags': [tag]} for tag in tags]
+    
+    print(f"{len(kb.questions)} rows, {args.queries} queries per filter, top {args.top_k}")
+    print(f"{'filter':<34}{'rows':>6}{'method':>10}{'slice ms':>10}{'post ms':>9}{'speedup':>9}  matches brute force")
+    for search_filter in filters:
+        search_slice = kb.get_slice(**search_filter)
+        rows = set(search_slice.rows.tolist())
+        queries = [make_typo(kb.questions[int(rng.choice(search_slice.rows))], rng) for _ in range(args.queries)]
+        label = search_filter.get('category') or f"tag {search_filter['tags'][0]}"
+        for method in ('fuzzy', 'semantic', 'hybrid'):
+            sliced = time_ms(lambda q: kb.search(q, method, args.top_k, **search_filter), queries)
+            posted = time_ms(lambda q: post_filter(kb, q, method, args.top_k, rows), queries)
+            
+            # Every result must come from the filter, and the semantic scores must equal scoring the rows
+            # directly; rows are not compared because duplicate questions tie
+            correct = all(
+                result['index'] in rows for query in queries
+                for result in kb.search(query, method, args.top_k, **search_filter)
+            )
+            if method == 'semantic':
+                correct = correct and all(
+                    np.allclose([result['score'] for result in kb.search(query, method, args.top_k, **search_filter)],
+                                brute_force_semantic(kb, query, args.top_k, search_slice.rows), atol=1e-5)
+                    for query in queries
+                )
+            print(f"{filter_key(label):<34}{len(rows):>6}{method:>10}{sliced:>10.2f}{posted:>9.2f}"
+                  f"{posted / sliced:>8.1f}x  {correct}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Check FuzzyIndex against process.extract on dataset.xlsx and compare latency.
+
+Every dataset question is used as a query in three forms (as is, with a
+dropped character, with shuffled words), plus the quick-reply phrases.
+The script exits non-zero if any query returns a different top-k.
+
+Usage: python benchmarks/bench_fuzzy_index.py [--dataset dataset.xlsx] [--top-k 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+from fuzzywuzzy import fuzz, process
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot.fuzzy_index import FuzzyIndex  # noqa: E402
+
+
+def make_queries(questions, seed: int = 0):
+    """Build exact, typo'd and reordered variants of the questions"""
+    rng = random.Random(seed)
+    queries = ["Reset Password", "VPN Issues", "Software Install", "Hardware Problems",
+               "outlook not syncing on laptop", "printer", ""]
+    for question in questions:
+        queries.append(question)
+        if len(question) > 3:
+            cut = rng.randrange(len(question))
+            queries.append(question[:cut] + question[cut + 1:])
+        words = question.split()
+        rng.shuffle(words)
+        queries.append(' '.join(words))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--top-k', type=int, default=3)
+    args = parser.parse_args()
+    
+    df = pd.read_excel(args.dataset).dropna(subset=['questions', 'answers'])
+    choices = df['questions'].astype(str).str.lower().str.strip().tolist()
+    queries = [query.lower().strip() for query in make_queries(choices)]
+    
+    start = time.perf_counter()
+    index = FuzzyIndex(choices)
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    expected = [process.extract(query, choices, scorer=fuzz.token_sort_ratio, limit=args.top_k) for query in queries]
+    extract_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    start = time.perf_counter()
+    actual = [index.search(query, args.top_k) for query in queries]
+    index_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    mismatches = 0
+    for query, want, got in zip(queries, expected, actual):
+        got = [(choices[row], score) for row, score in got]
+        if want != got:
+            mismatches += 1
+            print(f"MISMATCH {query!r}: extract={want} index={got}")
+    
+    print(f"{len(choices)} choices, {len(queries)} queries, top_k={args.top_k}, index build {build_ms:.1f} ms")
+    print(f"process.extract: {extract_ms:.3f} ms/query")
+    print(f"FuzzyIndex:      {index_ms:.3f} ms/query ({extract_ms / index_ms:.1f}x)")
+    print(f"top-k mismatches: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
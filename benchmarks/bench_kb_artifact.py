@@ -0,0 +1,72 @@
+"""Benchmark cold knowledge base loading from the spreadsheet against the compiled artifact.
+
+Every run happens in a fresh interpreter, so the totals include importing
+what each path needs (pandas and openpyxl for the spreadsheet, only NumPy
+and the fuzzy matcher for the artifact); "load ms" excludes importing the
+package itself. The artifact is built first if it is missing or stale.
+
+Usage: python benchmarks/bench_kb_artifact.py [--dataset dataset.xlsx] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot import config  # noqa: E402
+from hcil_chatbot.compiled_kb import check_artifact  # noqa: E402
+
+LOAD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from hcil_chatbot import EnhancedKnowledgeBase
+load_start = time.perf_counter()
+kb = EnhancedKnowledgeBase()
+loaded = kb.load_compiled(sys.argv[2]) if sys.argv[1] == 'artifact' else kb.load_data(sys.argv[2])
+end = time.perf_counter()
+print(json.dumps({'loaded': loaded, 'ms': (end - start) * 1000, 'load_ms': (end - load_start) * 1000,
+                  'version': kb.version,
+                  'pandas': 'pandas' in sys.modules, 'openpyxl': 'openpyxl' in sys.modules}))
+"""
+
+
+def cold_load(mode: str, path: str) -> dict:
+    """Load the knowledge base in a fresh interpreter and return its report"""
+    output = subprocess.run(
+        [sys.executable, '-c', LOAD_SCRIPT, mode, path], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    
+    artifact_dir = os.path.join(ROOT, config.KB_ARTIFACT_DIR)
+    if check_artifact(args.dataset, artifact_dir) is not None:
+        subprocess.run([sys.executable, '-m', 'hcil_chatbot.artifact', 'build', '--source', args.dataset,
+                        '--output', artifact_dir], cwd=ROOT, capture_output=True, check=True)
+    
+    print(f"{'source':<12}{'median ms':>11}{'min ms':>9}{'load ms':>9}  imports")
+    versions = set()
+    for mode, path in (('excel', args.dataset), ('artifact', artifact_dir)):
+        reports = [cold_load(mode, path) for _ in range(args.runs)]
+        if not all(report['loaded'] for report in reports):
+            sys.exit(f"Loading from {path} failed")
+        versions.update(report['version'] for report in reports)
+        times = [report['ms'] for report in reports]
+        imports = ', '.join(name for name in ('pandas', 'openpyxl') if reports[0][name]) or 'no pandas/openpyxl'
+        load_ms = np.median([report['load_ms'] for report in reports])
+        print(f"{mode:<12}{np.median(times):>11.1f}{min(times):>9.1f}{load_ms:>9.1f}  {imports}")
+    print(f"same knowledge base version: {len(versions) == 1}")
+
+
+if __name__ == '__main__':
+    main()
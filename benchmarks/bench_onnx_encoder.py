@@ -0,0 +1,94 @@
+"""Compare the ONNX Runtime encoder with the PyTorch SentenceTransformer on dataset.xlsx.
+
+Accuracy: the knowledge base questions are embedded by each backend and
+searched with typo'd / reworded variants of the same questions; the report
+gives the share of queries whose top-1 question is the same under both backends,
+plus the mean cosine similarity between the two backends' vectors.
+Latency: single-query encode time (the per-message path) and a full-sheet
+batch encode.
+
+Usage: python benchmarks/bench_onnx_encoder.py [--model all-MiniLM-L6-v2] [--onnx-dir cache/onnx] [--no-quantize]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot.onnx_encoder import OnnxEncoder  # noqa: E402
+from hcil_chatbot.vector_search import VectorIndex  # noqa: E402
+
+
+def make_queries(questions, seed: int = 0):
+    """Build one typo'd and one prefix-reworded variant per question"""
+    rng = random.Random(seed)
+    queries = []
+    for question in questions:
+        cut = rng.randrange(len(question)) if question else 0
+        queries.append(question[:cut] + question[cut + 1:])
+        queries.append("hey, " + question.rstrip('?') + " asap")
+    return queries
+
+
+def latency_ms(encode, queries, repeats: int = 3):
+    """Get p50 and p99 single-query encode latency in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            encode([query])
+            timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--onnx-dir', default=os.path.join(ROOT, 'cache', 'onnx'))
+    parser.add_argument('--no-quantize', action='store_true')
+    args = parser.parse_args()
+    
+    from sentence_transformers import SentenceTransformer
+    
+    df = pd.read_excel(args.dataset).dropna(subset=['questions', 'answers'])
+    questions = df['questions'].astype(str).str.lower().str.strip().tolist()
+    queries = make_queries(questions)
+    
+    torch_model = SentenceTransformer(args.model, device='cpu')
+    onnx_model = OnnxEncoder.load_or_export(args.model, args.onnx_dir, quantize=not args.no_quantize)
+    backends = {
+        'pytorch': lambda texts: torch_model.encode(texts, show_progress_bar=False),
+        onnx_model.version_tag: onnx_model.encode,
+    }
+    
+    top1 = {}
+    vectors = {}
+    print(f"{'backend':>10} {'sheet encode s':>15} {'p50 ms/query':>13} {'p99 ms/query':>13}")
+    for name, encode in backends.items():
+        start = time.perf_counter()
+        kb_vectors = encode(questions)
+        sheet_s = time.perf_counter() - start
+        query_vectors = encode(queries)
+        vectors[name] = query_vectors
+        top1[name] = VectorIndex(kb_vectors).search_batch(query_vectors, 1)[0][:, 0]
+        p50, p99 = latency_ms(encode, queries[:100])
+        print(f"{name:>10} {sheet_s:>15.2f} {p50:>13.2f} {p99:>13.2f}")
+    
+    reference, candidate = list(backends)
+    # The sheet repeats question texts across rows, so compare the matched text rather than the row id
+    agreement = np.mean([questions[a] == questions[b] for a, b in zip(top1[reference], top1[candidate])])
+    cosine = np.mean(np.sum(vectors[reference] * vectors[candidate], axis=1) /
+                     (np.linalg.norm(vectors[reference], axis=1) * np.linalg.norm(vectors[candidate], axis=1)))
+    print(f"top-1 agreement over {len(queries)} queries: {agreement:.1%}")
+    print(f"mean cosine similarity between backends: {cosine:.4f}")
+
+
+if __name__ == '__main__':
+    main()
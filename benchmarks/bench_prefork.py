@@ -0,0 +1,146 @@
+"""Benchmark how API throughput and memory scale with pre-forked worker processes.
+
+For every process count, starts ``python -m hcil_chatbot.api --processes N``,
+waits for semantic search, and drives it from --clients client processes
+sending /chat/batch requests of typo'd dataset questions for --duration
+seconds. Every client seeds its own typos, so most queries miss the response
+cache and reach search and the encoder.
+
+Memory is read from /proc: RSS counts shared pages once per process, PSS
+splits them between the processes sharing them, so the gap between the two
+totals is what the workers share instead of holding private copies.
+
+Usage: python benchmarks/bench_prefork.py [--processes 1 2 4] [--clients 8] [--duration 10] [--batch-size 16]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_questions(dataset: str) -> List[str]:
+    """Get the unique dataset questions"""
+    import pandas as pd
+    return sorted(set(pd.read_excel(dataset)['questions'].dropna().astype(str)))
+
+
+def make_typo(text: str, rng: random.Random) -> str:
+    """Delete or swap one character"""
+    position = rng.randrange(max(len(text) - 1, 1))
+    if rng.random() < 0.5:
+        return text[:position] + text[position + 1:]
+    return text[:position] + text[position + 1:position + 2] + text[position:position + 1] + text[position + 2:]
+
+
+def run_client(url: str, questions: List[str], seed: int, duration: float, batch_size: int) -> Dict[str, int]:
+    """Send batches until the duration passes and count the answered queries"""
+    rng = random.Random(seed)
+    counts = {'queries': 0, 'rejected': 0, 'errors': 0}
+    deadline = time.perf_counter() + duration
+    with httpx.Client(timeout=60) as client:
+        while time.perf_counter() < deadline:
+            batch = [make_typo(rng.choice(questions), rng) for _ in range(batch_size)]
+            try:
+                response = client.post(f"{url}/chat/batch", json={'queries': batch})
+            except httpx.HTTPError:
+                counts['errors'] += 1
+                continue
+            if response.status_code == 200:
+                counts['queries'] += batch_size
+            elif response.status_code == 503:
+                counts['rejected'] += 1
+            else:
+                counts['errors'] += 1
+    return counts
+
+
+def server_pids(pid: int) -> List[int]:
+    """Get the server process and its forked workers"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", 'r') as f:
+            return [pid] + [int(child) for child in f.read().split()]
+    except OSError:
+        return [pid]
+
+
+def memory_mb(pids: List[int]) -> Dict[str, float]:
+    """Sum RSS and PSS over processes, in MB"""
+    totals = {'rss': 0.0, 'pss': 0.0}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+                for line in f:
+                    name, value = line.split(':', 1)
+                    if name.lower() in totals:
+                        totals[name.lower()] += int(value.split()[0]) / 1024
+        except OSError:
+            pass
+    return totals
+
+
+def wait_until_ready(url: str, timeout: float) -> bool:
+    """Poll /health until semantic search is available"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{url}/health").json().get('semantic_ready'):
+                return True
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--processes', nargs='+', type=int, default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--port', type=int, default=8790)
+    args = parser.parse_args()
+    
+    questions = load_questions(args.dataset)
+    url = f"http://127.0.0.1:{args.port}"
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, batches of {args.batch_size}, {args.duration:.0f}s per run")
+    print(f"{'processes':>9}{'queries/s':>11}{'speedup':>9}{'rejected':>10}{'RSS MB':>9}{'PSS MB':>9}")
+    
+    baseline = None
+    for processes in args.processes:
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'hcil_chatbot.api', '--port', str(args.port), '--processes', str(processes)],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not wait_until_ready(url, timeout=300):
+                sys.exit(f"Server with {processes} processes did not become ready")
+            
+            with multiprocessing.Pool(args.clients) as pool:
+                start = time.perf_counter()
+                results = pool.starmap(run_client, [
+                    (url, questions, seed, args.duration, args.batch_size) for seed in range(args.clients)
+                ])
+                elapsed = time.perf_counter() - start
+            memory = memory_mb(server_pids(server.pid))
+        finally:
+            server.terminate()
+            server.wait()
+        
+        throughput = sum(result['queries'] for result in results) / elapsed
+        rejected = sum(result['rejected'] for result in results)
+        baseline = baseline or throughput
+        print(f"{processes:>9}{throughput:>11.0f}{throughput / baseline:>8.2f}x{rejected:>10}"
+              f"{memory['rss']:>9.0f}{memory['pss']:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
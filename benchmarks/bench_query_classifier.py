@@ -0,0 +1,161 @@
+"""Check the greeting and gibberish classifier against the checked-in test set.
+
+benchmarks/data/classifier_cases.jsonl holds the greeting list on its first
+line, then one case per line with the labels the original implementation
+(a fuzz.partial_ratio loop over the greetings) assigned. The script checks
+GreetingMatcher and is_gibberish against those labels and against the
+original loop, reports microseconds per query for both, and exits non-zero
+on any mismatch. --regenerate rebuilds the file from dataset.xlsx using the
+original loop.
+
+Usage: python benchmarks/bench_query_classifier.py [--cases FILE] [--regenerate] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import string
+import sys
+import time
+
+from fuzzywuzzy import fuzz
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot.query_classifier import GreetingMatcher, is_gibberish  # noqa: E402
+
+DEFAULT_CASES = os.path.join(ROOT, 'benchmarks', 'data', 'classifier_cases.jsonl')
+
+GREETINGS = [
+    "hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening",
+    "how are you", "what's up", "sup", "thank you", "thanks", "bye", "goodbye"
+]
+
+
+def reference_greeting(greetings, text: str):
+    """The original ResponseGenerator.is_greeting loop"""
+    text_lower = text.lower().strip()
+    for greet in greetings:
+        if fuzz.partial_ratio(greet, text_lower) > 80:
+            return greet
+    return None
+
+
+def reference_gibberish(text: str) -> bool:
+    """The original ResponseGenerator.is_gibberish checks"""
+    text = text.strip()
+    if len(text) < 2:
+        return True
+    if re.fullmatch(r'[^\w\s]+', text):
+        return True
+    if len(set(text)) < 3:
+        return True
+    words = text.split()
+    if len(words) > 0 and sum(1 for w in words if not w.isalpha()) / len(words) > 0.5:
+        return True
+    return False
+
+
+def make_texts(questions, seed: int = 0):
+    """Build greetings, knowledge base questions, typo'd variants and junk input"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + " '"
+    
+    def typo(text: str) -> str:
+        chars = list(text)
+        for _ in range(rng.randint(1, 3)):
+            position = rng.randrange(len(chars) + 1)
+            operation = rng.random()
+            if operation < 0.33 and position < len(chars):
+                del chars[position]
+            elif operation < 0.66:
+                chars.insert(position, rng.choice(alphabet))
+            elif position < len(chars):
+                chars[position] = rng.choice(alphabet)
+        return ''.join(chars)
+    
+    texts = ["Reset Password", "VPN Issues", "Software Install", "Hardware Problems", "", " ", "?",
+             "!!!", "...", "aaaa", "12345", "ok", "k", "asdf qwer 123", "hi!", "Hello there", "HEY",
+             "thx", "thank u", "good nite", "gm", "byee", "sup?", "whats up", "howdy"]
+    for greeting in GREETINGS:
+        texts += [greeting, greeting.title(), f"{greeting}, my vpn is down", typo(greeting), typo(greeting)]
+    for question in questions:
+        texts += [question, typo(question), question[:rng.randint(1, max(1, len(question)))]]
+        texts.append(f"{rng.choice(GREETINGS)} {question}")
+    for _ in range(200):
+        texts.append(''.join(rng.choice(alphabet + string.digits + string.punctuation)
+                             for _ in range(rng.randint(1, 24))))
+    return texts
+
+
+def regenerate(path: str):
+    """Write the test set with labels from the original implementation"""
+    import pandas as pd
+    
+    df = pd.read_excel(os.path.join(ROOT, 'dataset.xlsx')).dropna(subset=['questions', 'answers'])
+    questions = sorted(set(df['questions'].astype(str)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'greetings': GREETINGS}) + '\n')
+        for text in make_texts(questions):
+            case = {'text': text, 'greeting': reference_greeting(GREETINGS, text),
+                    'gibberish': reference_gibberish(text)}
+            f.write(json.dumps(case) + '\n')
+
+
+def time_per_query(classify, texts, repeat: int) -> float:
+    """Get the best-of-repeat microseconds per text"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            classify(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', default=DEFAULT_CASES)
+    parser.add_argument('--regenerate', action='store_true')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    if args.regenerate:
+        regenerate(args.cases)
+    
+    with open(args.cases, 'r', encoding='utf-8') as f:
+        greetings = json.loads(f.readline())['greetings']
+        cases = [json.loads(line) for line in f if line.strip()]
+    texts = [case['text'] for case in cases]
+    matcher = GreetingMatcher(greetings)
+    
+    def compiled(text: str):
+        return is_gibberish(text), matcher.match(text.lower().strip())
+    
+    def original(text: str):
+        return reference_gibberish(text), reference_greeting(greetings, text)
+    
+    mismatches = 0
+    for case in cases:
+        want = (case['gibberish'], case['greeting'])
+        got = compiled(case['text'])
+        if got != want or original(case['text']) != want:
+            mismatches += 1
+            print(f"MISMATCH {case['text']!r}: expected={want} compiled={got}")
+    
+    original_us = time_per_query(original, texts, args.repeat)
+    compiled_us = time_per_query(compiled, texts, args.repeat)
+    greetings_found = sum(1 for case in cases if case['greeting'])
+    print(f"{len(cases)} cases ({greetings_found} greetings, "
+          f"{sum(1 for case in cases if case['gibberish'])} gibberish)")
+    print(f"original loop:    {original_us:.1f} us/query")
+    print(f"GreetingMatcher:  {compiled_us:.1f} us/query ({original_us / compiled_us:.1f}x)")
+    print(f"classification mismatches: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
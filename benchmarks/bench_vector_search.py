@@ -0,0 +1,59 @@
+"""Benchmark VectorIndex against the previous sklearn NearestNeighbors path.
+
+Usage: python benchmarks/bench_vector_search.py [--dim 384] [--queries 200] [--top-k 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hcil_chatbot.vector_search import VectorIndex, normalize_rows  # noqa: E402
+
+
+def time_per_query(fn, queries) -> float:
+    """Run fn once per query and return the mean latency in milliseconds"""
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    
+    from sklearn.neighbors import NearestNeighbors
+    
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>8} {'sklearn ms/q':>13} {'index ms/q':>11} {'batch ms/q':>11} {'speedup':>8} {'same top-k':>10}")
+    for size in args.sizes:
+        embeddings = normalize_rows(rng.standard_normal((size, args.dim)).astype(np.float32))
+        queries = normalize_rows(rng.standard_normal((args.queries, args.dim)).astype(np.float32))
+        
+        nn_model = NearestNeighbors(n_neighbors=args.top_k, metric='cosine').fit(embeddings)
+        index = VectorIndex(embeddings)
+        
+        sklearn_ms = time_per_query(lambda q: nn_model.kneighbors(q[np.newaxis, :]), queries)
+        index_ms = time_per_query(lambda q: index.search(q, args.top_k), queries)
+        
+        start = time.perf_counter()
+        batch_indices, _ = index.search_batch(queries, args.top_k)
+        batch_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        
+        _, sklearn_indices = nn_model.kneighbors(queries)
+        agreement = np.mean([set(a) == set(b) for a, b in zip(sklearn_indices, batch_indices)])
+        
+        print(f"{size:>8} {sklearn_ms:>13.3f} {index_ms:>11.3f} {batch_ms:>11.3f} "
+              f"{sklearn_ms / index_ms:>7.1f}x {agreement:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""Offline accuracy and latency evaluation of the retrieval pipeline.
+
+Builds query sets from the questions in dataset.xlsx (the questions as is,
+typo'd copies and rule-based paraphrases), runs every query through each
+search method of EnhancedKnowledgeBase and through
+ResponseGenerator.generate_response, and reports top-1/top-3 accuracy, MRR,
+p50/p95/p99 latency and queries/sec. A result counts as correct when it
+carries the answer of the question the query was built from.
+
+Results are written as JSON; pass --compare with an earlier results file to
+print the change of every metric.
+
+Usage: python benchmarks/eval_retrieval.py [--dataset dataset.xlsx] [--methods semantic fuzzy hybrid bm25 rerank response]
+                                           [--sets exact typo paraphrase] [--output results.json]
+                                           [--compare baseline.json] [--answer-weight 0.3]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import string
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcil_chatbot import EnhancedKnowledgeBase, ResponseGenerator, config, get_model_version, load_model  # noqa: E402
+
+METHODS = ['semantic', 'fuzzy', 'hybrid', 'bm25', 'rerank', 'response']
+QUERY_SETS = ['exact', 'typo', 'paraphrase']
+METRICS = ['top1', 'top3', 'mrr', 'p50_ms', 'p95_ms', 'p99_ms', 'qps']
+
+# Rewrites applied by the paraphrase set; phrases not in a question are skipped
+PARAPHRASES = [
+    ("how do i resolve", "how can i fix"),
+    ("what should i do if", "what to do when"),
+    ("need help with", "i need assistance with"),
+    ("i'm facing an issue with", "having trouble with"),
+    ("can someone assist me regarding", "could anyone help me with"),
+    (" occurs", " happens"),
+    (", please", " pls"),
+    ("issue", "problem"),
+    ("not working", "broken"),
+    ("error", "failure"),
+    ("request", "requirement"),
+    ("slow", "sluggish"),
+]
+PREFIXES = ["", "", "urgent: ", "quick question - ", "for my laptop, "]
+SUFFIXES = ["", "", " asap", " today", " again"]
+
+
+def make_typo(text: str, rng: random.Random) -> str:
+    """Apply one or two character deletions, insertions, substitutions or transpositions"""
+    chars = list(text)
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(max(len(chars) - 1, 1))
+        operation = rng.choice(['delete', 'insert', 'substitute', 'transpose'])
+        if operation == 'delete' and len(chars) > 1:
+            del chars[position]
+        elif operation == 'insert':
+            chars.insert(position, rng.choice(string.ascii_lowercase))
+        elif operation == 'substitute':
+            chars[position] = rng.choice(string.ascii_lowercase)
+        elif position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return ''.join(chars)
+
+
+def make_paraphrase(text: str, rng: random.Random) -> str:
+    """Reword a question with phrase rewrites, filler and dropped punctuation"""
+    text = text.lower()
+    rewrites = [(old, new) for old, new in PARAPHRASES if old in text]
+    for old, new in rng.sample(rewrites, min(len(rewrites), rng.randint(1, 2))):
+        text = text.replace(old, new)
+    text = re.sub(r'[?.!]+$', '', text)
+    return rng.choice(PREFIXES) + text + rng.choice(SUFFIXES)
+
+
+def make_query_sets(questions: List[str], answers: List[str], seed: int = 0) -> Dict[str, List[Tuple[str, str]]]:
+    """Build (query, expected answer) pairs for every query set from the unique questions"""
+    rng = random.Random(seed)
+    pairs = list(dict(zip(questions, answers)).items())
+    return {
+        'exact': pairs,
+        'typo': [(make_typo(question, rng), answer) for question, answer in pairs],
+        'paraphrase': [(make_paraphrase(question, rng), answer) for question, answer in pairs]
+    }
+
+
+def summarize(ranks: List[int], latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Get accuracy, MRR and latency figures from 1-based ranks (0 = not found) and seconds"""
+    ranks = np.array(ranks)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'queries': len(ranks),
+        'top1': float(np.mean(ranks == 1)),
+        'top3': float(np.mean((ranks >= 1) & (ranks <= 3))),
+        'mrr': float(np.mean(np.where(ranks > 0, 1 / np.maximum(ranks, 1), 0.0))),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'qps': len(ranks) / elapsed if elapsed else 0.0
+    }
+
+
+def evaluate(run_query, queries: List[Tuple[str, str]], warmup: int) -> Dict[str, float]:
+    """Time run_query over the queries; it returns the answers it ranked, best first"""
+    for query, _ in queries[:warmup]:
+        run_query(query)
+    
+    ranks, latencies = [], []
+    start = time.perf_counter()
+    for query, expected in queries:
+        query_start = time.perf_counter()
+        answers = run_query(query)
+        latencies.append(time.perf_counter() - query_start)
+        ranks.append(answers.index(expected) + 1 if expected in answers else 0)
+    return summarize(ranks, latencies, time.perf_counter() - start)
+
+
+def compare(results: Dict, baseline: Dict):
+    """Print every metric next to the baseline run"""
+    print(f"\nchange against {baseline['timestamp']}:")
+    for method, query_sets in results['results'].items():
+        for query_set, metrics in query_sets.items():
+            before = baseline['results'].get(method, {}).get(query_set)
+            if before is None:
+                continue
+            changes = ', '.join(f"{name} {before[name]:.3f}->{metrics[name]:.3f}" for name in METRICS)
+            print(f"  {method}/{query_set}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--methods', nargs='+', choices=METHODS, default=METHODS)
+    parser.add_argument('--sets', nargs='+', choices=QUERY_SETS, default=QUERY_SETS)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--answer-weight', type=float, default=None,
+                        help='enable multi-field search with this answer weight (questions get the rest)')
+    args = parser.parse_args()
+    if args.answer_weight is not None:
+        config.MULTI_FIELD_SEARCH = True
+        config.FIELD_WEIGHTS = {'questions': 1.0 - args.answer_weight, 'answers': args.answer_weight}
+    
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(ROOT)
+    
+    model = load_model()
+    kb = EnhancedKnowledgeBase(model)
+    if not kb.load_data(args.dataset):
+        sys.exit(f"Could not load {args.dataset}")
+    generator = ResponseGenerator(kb)
+    
+    def search(method: str):
+        def run_query(query: str) -> List[str]:
+            return [result['answer'] for result in kb.search(query, method=method, top_k=args.top_k)]
+        return run_query
+    
+    def respond(query: str) -> List[str]:
+        # The pipeline returns one answer, embedded in the formatted reply
+        response = generator.generate_response(query)['response']
+        return [answer for answer in kb.answer_values if answer in response][:1]
+    
+    query_sets = make_query_sets(kb.questions, [kb.answer_values[code] for code in kb.answer_codes], args.seed)
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'dataset': os.path.relpath(os.path.abspath(args.dataset), ROOT),
+        'model_version': get_model_version(model),
+        'kb_version': kb.version,
+        'config': {
+            'encoder_backend': config.ENCODER_BACKEND,
+            'index_backend': config.INDEX_BACKEND,
+            'fusion_depth': config.FUSION_DEPTH,
+            'rrf_k': config.RRF_K,
+            'fuzzy_early_exit_score': config.FUZZY_EARLY_EXIT_SCORE,
+            'hybrid_bm25': config.HYBRID_BM25,
+            'multi_field_search': config.MULTI_FIELD_SEARCH,
+            'field_weights': config.FIELD_WEIGHTS if config.MULTI_FIELD_SEARCH else None,
+            'top_k': args.top_k,
+            'seed': args.seed
+        },
+        'results': {}
+    }
+    
+    print(f"{'method':<10}{'set':<12}{'n':>5}{'top1':>7}{'top3':>7}{'mrr':>7}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'qps':>9}")
+    for method in args.methods:
+        run_query = respond if method == 'response' else search(method)
+        results['results'][method] = {}
+        for name in args.sets:
+            metrics = evaluate(run_query, query_sets[name], args.warmup)
+            results['results'][method][name] = metrics
+            print(f"{method:<10}{name:<12}{metrics['queries']:>5}{metrics['top1']:>7.3f}{metrics['top3']:>7.3f}"
+                  f"{metrics['mrr']:>7.3f}{metrics['p50_ms']:>9.2f}{metrics['p95_ms']:>9.2f}"
+                  f"{metrics['p99_ms']:>9.2f}{metrics['qps']:>9.0f}")
+    results['hybrid_search_stats'] = kb.search_stats()
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
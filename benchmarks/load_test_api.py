@@ -0,0 +1,118 @@
+"""Load-test the HTTP chat API with concurrent clients.
+
+Sends dataset questions (as is and with a typo) to a running
+``python -m hcil_chatbot.api`` from --concurrency clients until --requests
+requests are done, then reports throughput, latency percentiles and the
+status codes seen. 503 responses are the server shedding load once its
+queue is full; they are counted, not retried.
+
+Usage: python benchmarks/load_test_api.py [--url http://127.0.0.1:8000] [--concurrency 32]
+                                          [--requests 2000] [--batch-size 0] [--wait-ready 120]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_queries(dataset: str, seed: int = 0):
+    """Build query texts from the dataset questions"""
+    import pandas as pd
+    
+    rng = random.Random(seed)
+    questions = sorted(set(pd.read_excel(dataset)['questions'].dropna().astype(str)))
+    queries = list(questions)
+    for question in questions:
+        cut = rng.randrange(len(question))
+        queries.append(question[:cut] + question[cut + 1:])
+    rng.shuffle(queries)
+    return queries
+
+
+async def wait_until_ready(client: httpx.AsyncClient, url: str, timeout: float):
+    """Poll /health until semantic search is available or the timeout passes"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            health = (await client.get(f"{url}/health")).json()
+            if health.get('semantic_ready'):
+                return True
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    return False
+
+
+async def run(args):
+    queries = load_queries(args.dataset)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        if args.wait_ready and not await wait_until_ready(client, args.url, args.wait_ready):
+            print("server not ready with semantic search, testing anyway")
+        
+        statuses: Counter = Counter()
+        latencies = []
+        next_request = iter(range(args.requests))
+        
+        async def client_loop(client_id: int):
+            rng = random.Random(client_id)
+            for _ in next_request:
+                start = time.perf_counter()
+                try:
+                    if args.batch_size:
+                        batch = [rng.choice(queries) for _ in range(args.batch_size)]
+                        response = await client.post(f"{args.url}/chat/batch", json={'queries': batch})
+                    else:
+                        response = await client.post(f"{args.url}/chat", json={'query': rng.choice(queries)})
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        
+        server_stats = (await client.get(f"{args.url}/stats")).json()
+    
+    ok = statuses.get(200, 0)
+    per_request = max(args.batch_size, 1)
+    print(f"{args.requests} requests ({per_request} queries each), concurrency {args.concurrency}, {elapsed:.1f}s")
+    print(f"statuses: {dict(statuses)}")
+    if latencies:
+        latencies_ms = np.array(latencies) * 1000
+        print(f"throughput: {ok / elapsed:.0f} req/s, {ok * per_request / elapsed:.0f} queries/s")
+        print(f"latency ms: p50 {np.percentile(latencies_ms, 50):.1f}  p95 {np.percentile(latencies_ms, 95):.1f}  "
+              f"p99 {np.percentile(latencies_ms, 99):.1f}")
+    print(f"server: {server_stats['service']}")
+    print(f"search: fast path {server_stats['search']['fast_path_rate']:.0%}, "
+          f"response cache hit rate {server_stats['response_cache']['hit_rate']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'dataset.xlsx'))
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=0, help='queries per /chat/batch request; 0 uses /chat')
+    parser.add_argument('--wait-ready', type=float, default=120, help='seconds to wait for semantic search; 0 skips')
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except httpx.ConnectError:
+        sys.exit(f"Could not connect to {args.url}; start it with: python -m hcil_chatbot.api")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Profile what enhanced_chatbot.py imports before it renders anything.
+
+The module-level imports of the app are extracted with ast (skipping
+``if TYPE_CHECKING`` blocks) and run in a fresh interpreter under
+``python -X importtime``. The script prints the slowest top-level packages
+by cumulative import time and exits non-zero if any dependency that should
+load lazily (torch, sklearn, pandas, ...) is pulled in at import time.
+
+Usage: python benchmarks/profile_imports.py [--top 15] [--raw importtime.log]
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'enhanced_chatbot.py')
+
+# Dependencies that must only be imported on first use
+DEFERRED = [
+    'torch', 'sentence_transformers', 'transformers', 'sklearn',
+    'pandas', 'openpyxl', 'fuzzywuzzy', 'Levenshtein', 'onnxruntime'
+]
+
+
+def module_imports(path: str) -> Tuple[str, Set[str]]:
+    """Get the source of a script's module-level imports and the top-level packages they name"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    packages = set()
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            packages.update(alias.name.split('.')[0] for alias in node.names)
+        else:
+            packages.add(node.module.split('.')[0])
+    return '\n'.join(ast.unparse(node) for node in nodes), packages
+
+
+def run_importtime(source: str):
+    """Run source under -X importtime; return the raw report and the modules it left loaded"""
+    source += "\nimport sys\nprint(' '.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', source],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stderr, set(result.stdout.split())
+
+
+def parse_report(report: str, requested: Set[str]):
+    """Get cumulative microseconds per requested top-level package and the total"""
+    packages = defaultdict(int)
+    total = 0
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nesting is shown by indentation; depth one entries are imported directly, and
+        # the interpreter's own startup imports (site, encodings, ...) are skipped
+        package = name.strip().split('.')[0]
+        if len(name) - len(name.lstrip()) == 1 and package in requested:
+            packages[package] += int(cumulative_us)
+            total += int(cumulative_us)
+    return packages, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--raw', help='also write the raw -X importtime report to this file')
+    args = parser.parse_args()
+    
+    source, requested = module_imports(APP)
+    report, loaded = run_importtime(source)
+    if args.raw:
+        with open(args.raw, 'w', encoding='utf-8') as f:
+            f.write(report)
+    
+    packages, total = parse_report(report, requested)
+    print(f"{'package':<28}{'cumulative ms':>15}")
+    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28}{us / 1000:>15.1f}")
+    print(f"{'total':<28}{total / 1000:>15.1f}")
+    
+    eager = [name for name in DEFERRED if name in loaded]
+    if eager:
+        print(f"imported eagerly but should be deferred: {', '.join(eager)}")
+        sys.exit(1)
+    print(f"none of {', '.join(DEFERRED)} imported at startup")
+
+
+if __name__ == '__main__':
+    main()
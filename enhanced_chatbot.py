@@ -1,33 +1,20 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.neighbors import NearestNeighbors
 import time
-import re
-from fuzzywuzzy import fuzz
-from fuzzywuzzy import process
 import random
-from datetime import datetime
-import json
-import pickle
 import os
 import html
-from typing import List, Dict, Tuple, Optional
+from typing import Dict, Optional
 import logging
+import itertools
+
+from hcil_chatbot import ChatEngine, ConversationManager, config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configuration
-KNOWLEDGE_BASE_PATH = 'dataset.xlsx'
-CACHE_DIR = 'cache'
-EMBEDDINGS_CACHE_FILE = os.path.join(CACHE_DIR, 'embeddings.pkl')
-MODEL_CACHE_FILE = os.path.join(CACHE_DIR, 'model.pkl')
-
 # Create cache directory if it doesn't exist
-os.makedirs(CACHE_DIR, exist_ok=True)
+os.makedirs(config.CACHE_DIR, exist_ok=True)
 
 # Page Configuration
 st.set_page_config(
@@ -212,413 +199,58 @@ footer { visibility: hidden; }
 </style>
 """, unsafe_allow_html=True)
 
-# Enhanced Backend Classes
-class ConversationManager:
-    """Manages conversation context and history"""
-    
-    def __init__(self, max_history: int = 10):
-        self.max_history = max_history
-        self.conversation_history = []
-        self.context_window = []
-    
-    def add_message(self, role: str, content: str, timestamp: datetime = None):
-        """Add a message to conversation history"""
-        if timestamp is None:
-            timestamp = datetime.now()
-        
-        # Sanitize content for security
-        sanitized_content = html.escape(content)
-        
-        message = {
-            'role': role,
-            'content': sanitized_content,
-            'timestamp': timestamp
-        }
-        
-        self.conversation_history.append(message)
-        
-        # Maintain context window
-        if len(self.context_window) >= self.max_history:
-            self.context_window.pop(0)
-        self.context_window.append(message)
-    
-    def get_context(self) -> List[Dict]:
-        """Get recent conversation context"""
-        return self.context_window[-5:] if len(self.context_window) > 5 else self.context_window
-    
-    def clear_history(self):
-        """Clear conversation history"""
-        self.conversation_history.clear()
-        self.context_window.clear()
-
-class EnhancedKnowledgeBase:
-    """Enhanced knowledge base with caching and better search"""
-    
-    def __init__(self, model: SentenceTransformer):
-        self.model = model
-        self.df = None
-        self.embeddings = None
-        self.nn_model = None
-        self.question_embeddings = None
-        self.answer_embeddings = None
-        self.categories = set()
-        self.tags = set()
-    
-    def load_data(self, file_path: str) -> bool:
-        """Load and preprocess knowledge base data"""
-        try:
-            if not os.path.exists(file_path):
-                logger.error(f"Knowledge base file not found: {file_path}")
-                return False
-            
-            self.df = pd.read_excel(file_path)
-            required_columns = {'questions', 'answers', 'categories', 'tags'}
-            
-            if not required_columns.issubset(self.df.columns):
-                missing_cols = required_columns - set(self.df.columns)
-                logger.error(f"Missing required columns: {missing_cols}")
-                return False
-            
-            # Clean and preprocess data
-            self.df = self.df.dropna(subset=['questions', 'answers'])
-            self.df['questions_clean'] = self.df['questions'].astype(str).str.lower().str.strip()
-            self.df['answers_clean'] = self.df['answers'].astype(str).str.strip()
-            
-            # Extract categories and tags
-            self.categories = set(self.df['categories'].dropna().unique())
-            self.tags = set(self.df['tags'].dropna().unique())
-            
-            # Generate embeddings
-            self._generate_embeddings()
-            
-            logger.info(f"Knowledge base loaded successfully with {len(self.df)} entries")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error loading knowledge base: {e}")
-            return False
-    
-    def _generate_embeddings(self):
-        """Generate embeddings for questions and answers"""
-        try:
-            # Check cache first
-            if os.path.exists(EMBEDDINGS_CACHE_FILE):
-                try:
-                    with open(EMBEDDINGS_CACHE_FILE, 'rb') as f:
-                        cached_data = pickle.load(f)
-                        current_hash = hash(str(self.df['questions'].tolist()))
-                        if cached_data.get('df_hash') == current_hash:
-                            self.question_embeddings = cached_data['question_embeddings']
-                            self.answer_embeddings = cached_data['answer_embeddings']
-                            logger.info("Loaded embeddings from cache")
-                            return
-                except Exception as e:
-                    logger.warning(f"Cache loading failed: {e}")
-            
-            # Generate new embeddings
-            logger.info("Generating embeddings...")
-            self.question_embeddings = self.model.encode(self.df['questions_clean'].tolist())
-            self.answer_embeddings = self.model.encode(self.df['answers_clean'].tolist())
-            
-            # Cache embeddings
-            try:
-                cache_data = {
-                    'df_hash': hash(str(self.df['questions'].tolist())),
-                    'question_embeddings': self.question_embeddings,
-                    'answer_embeddings': self.answer_embeddings
-                }
-                with open(EMBEDDINGS_CACHE_FILE, 'wb') as f:
-                    pickle.dump(cache_data, f)
-                logger.info("Embeddings generated and cached")
-            except Exception as e:
-                logger.warning(f"Failed to cache embeddings: {e}")
-            
-        except Exception as e:
-            logger.error(f"Error generating embeddings: {e}")
-            raise
-    
-    def search(self, query: str, method: str = 'hybrid', top_k: int = 3) -> List[Dict]:
-        """Enhanced search with multiple methods - FIXED VERSION"""
-        if not hasattr(self, 'df') or self.df is None:
-            return []
-        
-        query_clean = query.lower().strip()
-        if not query_clean:
-            return []
-        
-        try:
-            query_embedding = self.model.encode([query_clean])
-        except Exception as e:
-            logger.error(f"Error encoding query: {e}")
-            return []
-        
-        results = []
-        
-        if method == 'semantic':
-            results = self._semantic_search(query_embedding, top_k)
-        elif method == 'fuzzy':
-            results = self._fuzzy_search(query_clean, top_k)
-        elif method == 'hybrid':
-            # FIXED: No more infinite recursion - call internal methods directly
-            semantic_results = self._semantic_search(query_embedding, top_k)
-            fuzzy_results = self._fuzzy_search(query_clean, top_k)
-            results = self._merge_results(semantic_results, fuzzy_results, top_k)
-        
-        return results
-    
-    def _semantic_search(self, query_embedding, top_k: int) -> List[Dict]:
-        """Perform semantic search using embeddings"""
-        try:
-            if self.nn_model is None:
-                self.nn_model = NearestNeighbors(n_neighbors=min(top_k, len(self.df)), metric='cosine')
-                self.nn_model.fit(self.question_embeddings)
-            
-            distances, indices = self.nn_model.kneighbors(query_embedding)
-            
-            results = []
-            for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-                if idx < len(self.df):
-                    results.append({
-                        'index': int(idx),
-                        'question': str(self.df.iloc[idx]['questions']),
-                        'answer': str(self.df.iloc[idx]['answers']),
-                        'category': str(self.df.iloc[idx]['categories']) if pd.notna(self.df.iloc[idx]['categories']) else '',
-                        'tags': str(self.df.iloc[idx]['tags']) if pd.notna(self.df.iloc[idx]['tags']) else '',
-                        'score': float(1 - distance),
-                        'method': 'semantic'
-                    })
-            
-            return results
-        except Exception as e:
-            logger.error(f"Error in semantic search: {e}")
-            return []
-    
-    def _fuzzy_search(self, query_clean: str, top_k: int) -> List[Dict]:
-        """Perform fuzzy string matching"""
-        try:
-            fuzzy_results = process.extract(
-                query_clean, 
-                self.df['questions_clean'].tolist(), 
-                scorer=fuzz.token_sort_ratio, 
-                limit=top_k
-            )
-            
-            results = []
-            for question, score in fuzzy_results:
-                try:
-                    idx = self.df[self.df['questions_clean'] == question].index[0]
-                    results.append({
-                        'index': int(idx),
-                        'question': str(self.df.iloc[idx]['questions']),
-                        'answer': str(self.df.iloc[idx]['answers']),
-                        'category': str(self.df.iloc[idx]['categories']) if pd.notna(self.df.iloc[idx]['categories']) else '',
-                        'tags': str(self.df.iloc[idx]['tags']) if pd.notna(self.df.iloc[idx]['tags']) else '',
-                        'score': float(score / 100),
-                        'method': 'fuzzy'
-                    })
-                except (IndexError, KeyError):
-                    continue
-            
-            return results
-        except Exception as e:
-            logger.error(f"Error in fuzzy search: {e}")
-            return []
-    
-    def _merge_results(self, semantic_results: List[Dict], fuzzy_results: List[Dict], top_k: int) -> List[Dict]:
-        """Merge and deduplicate search results"""
-        try:
-            all_results = semantic_results + fuzzy_results
-            seen_indices = set()
-            merged_results = []
-            
-            for result in all_results:
-                if result['index'] not in seen_indices:
-                    seen_indices.add(result['index'])
-                    merged_results.append(result)
-            
-            # Sort by score and take top_k
-            merged_results.sort(key=lambda x: x['score'], reverse=True)
-            return merged_results[:top_k]
-        except Exception as e:
-            logger.error(f"Error merging results: {e}")
-            return semantic_results[:top_k] if semantic_results else fuzzy_results[:top_k]
-    
-    def get_categories(self) -> List[str]:
-        """Get all available categories"""
-        return list(self.categories)
-    
-    def get_tags(self) -> List[str]:
-        """Get all available tags"""
-        return list(self.tags)
-    
-    def filter_by_category(self, category: str) -> pd.DataFrame:
-        """Filter knowledge base by category"""
-        return self.df[self.df['categories'] == category]
+# Shared Engine
+@st.cache_resource
+def get_engine() -> ChatEngine:
+    """Build the engine once per process and share it read-only across sessions"""
+    return ChatEngine(config.KNOWLEDGE_BASE_PATH)
 
-class ResponseGenerator:
-    """Enhanced response generation with context awareness"""
-    
-    def __init__(self, knowledge_base: EnhancedKnowledgeBase):
-        self.kb = knowledge_base
-        self.greetings = {
-            "hello": "Hello! 👋 Welcome to HCIL IT Support. How may I assist you today?",
-            "hi": "Hi there! 🌟 Ready to help with your IT needs!",
-            "hey": "Hey! 💫 What can I help you with today?",
-            "greetings": "Greetings! 🎯 I'm here to assist with any IT issues.",
-            "good morning": "Good morning! ☀️ How can I brighten your day with IT solutions?",
-            "good afternoon": "Good afternoon! 🌤️ Ready to tackle any IT challenges!",
-            "good evening": "Good evening! 🌙 How may I assist you?",
-            "how are you": "I'm functioning optimally and ready to help! 🤖✨ What brings you here?",
-            "what's up": "Ready to solve IT problems! 💪 What's on your mind?",
-            "sup": "All systems operational! 🚀 How can I help?",
-            "thank you": "You're very welcome! 🙏 Happy to help anytime!",
-            "thanks": "My pleasure! ✨",
-            "bye": "Thank you for using HCIL IT Support! **Sayonara!** 👋✨",
-            "goodbye": "Until next time! **Mata ne!** 🌟 Have a great day!"
-        }
-    
-    def is_greeting(self, text: str) -> Optional[str]:
-        """Check if text is a greeting"""
-        text_lower = text.lower().strip()
-        for greet in self.greetings.keys():
-            if fuzz.partial_ratio(greet, text_lower) > 80:
-                return greet
-        return None
-    
-    def is_gibberish(self, text: str) -> bool:
-        """Check if text is gibberish"""
-        text = text.strip()
-        if len(text) < 2:
-            return True
-        if re.fullmatch(r'[^\w\s]+', text):
-            return True
-        if len(set(text)) < 3:
-            return True
-        words = text.split()
-        if len(words) > 0 and sum(1 for w in words if not w.isalpha()) / len(words) > 0.5:
-            return True
-        return False
-    
-    def generate_response(self, query: str, context: List[Dict] = None) -> Dict:
-        """Generate enhanced response with context awareness"""
-        start_time = time.time()
-        
-        try:
-            # Check for gibberish
-            if self.is_gibberish(query):
-                return {
-                    'response': "🤔 I couldn't quite understand that. Could you please rephrase your question?",
-                    'confidence': 0.0,
-                    'method': 'gibberish_detection',
-                    'processing_time': time.time() - start_time
-                }
-            
-            # Check for greetings
-            greeting = self.is_greeting(query)
-            if greeting:
-                return {
-                    'response': self.greetings[greeting],
-                    'confidence': 1.0,
-                    'method': 'greeting',
-                    'processing_time': time.time() - start_time
-                }
-            
-            # Search knowledge base
-            search_results = self.kb.search(query, method='hybrid', top_k=3)
-            
-            if not search_results:
-                return {
-                    'response': "🤔 I couldn't find a specific answer. Could you provide more details or try rephrasing?",
-                    'confidence': 0.0,
-                    'method': 'no_results',
-                    'processing_time': time.time() - start_time
-                }
-            
-            # Get best match
-            best_match = search_results[0]
-            
-            # Enhance response based on context
-            enhanced_response = self._enhance_response(best_match, context)
-            
-            return {
-                'response': enhanced_response,
-                'confidence': best_match['score'],
-                'method': best_match['method'],
-                'category': best_match['category'],
-                'tags': best_match['tags'],
-                'processing_time': time.time() - start_time,
-                'alternatives': search_results[1:] if len(search_results) > 1 else []
-            }
-        
-        except Exception as e:
-            logger.error(f"Error generating response: {e}")
-            return {
-                'response': "😔 I encountered an error while processing your request. Please try again.",
-                'confidence': 0.0,
-                'method': 'error',
-                'processing_time': time.time() - start_time
-            }
-    
-    def _enhance_response(self, match: Dict, context: List[Dict] = None) -> str:
-        """Enhance response with additional context and formatting"""
-        try:
-            base_response = str(match['answer'])
-            
-            # Add category context if available
-            if match.get('category') and match['category'].strip():
-                category_info = f"\n\n**Category:** {match['category']}"
-                base_response += category_info
-            
-            # Add related tags if available
-            if match.get('tags') and match['tags'].strip():
-                tags_info = f"\n\n**Related:** {match['tags']}"
-                base_response += tags_info
-            
-            return base_response
-        except Exception as e:
-            logger.error(f"Error enhancing response: {e}")
-            return str(match.get('answer', ''))
+@st.cache_resource
+def get_startup_metrics() -> Dict[str, Optional[float]]:
+    """Record when this process first ran the script, for startup latency reporting"""
+    return {'started_at': time.time(), 'first_paint': None, 'first_semantic_answer': None}
+
+def record_startup_metric(name: str, response_data: Optional[Dict] = None):
+    """Log a startup milestone the first time it is reached"""
+    metrics = get_startup_metrics()
+    if metrics[name] is not None:
+        return
+    if response_data is not None and not response_data.get('semantic_available'):
+        return
+    metrics[name] = time.time() - metrics['started_at']
+    logger.info(f"Time to {name.replace('_', ' ')}: {metrics[name]:.2f}s after startup")
 
-# Cached Model Loading
 @st.cache_resource
-def load_model():
-    """Load and cache the sentence transformer model"""
-    try:
-        if os.path.exists(MODEL_CACHE_FILE):
-            try:
-                with open(MODEL_CACHE_FILE, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cached model: {e}")
-        
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        
-        try:
-            with open(MODEL_CACHE_FILE, 'wb') as f:
-                pickle.dump(model, f)
-        except Exception as e:
-            logger.warning(f"Failed to cache model: {e}")
-        
-        return model
-    except Exception as e:
-        logger.error(f"Error loading model: {e}")
-        return SentenceTransformer("all-MiniLM-L6-v2")
+def get_session_counter() -> itertools.count:
+    """Count sessions started in this process"""
+    return itertools.count(1)
 
 # Initialize Components
-if 'model' not in st.session_state:
-    st.session_state.model = load_model()
-
-if 'knowledge_base' not in st.session_state:
-    st.session_state.knowledge_base = EnhancedKnowledgeBase(st.session_state.model)
-    if not st.session_state.knowledge_base.load_data(KNOWLEDGE_BASE_PATH):
-        st.error("Failed to load knowledge base. Please check the dataset file.")
-        st.stop()
+get_startup_metrics()
+session_start = time.time()
+
+# Read the knowledge base on every run: edits to the dataset swap in a new version while serving
+knowledge_base = get_engine().knowledge_base
+if knowledge_base is None:
+    # The engine stays cached, so retry the load instead of serving the failure until restart
+    get_engine().retry_load()
+    knowledge_base = get_engine().knowledge_base
+if knowledge_base is None:
+    st.error("Failed to load knowledge base. Please check the dataset file.")
+    st.stop()
+
+if 'session_started' not in st.session_state:
+    st.session_state.session_started = session_start
+    logger.info(
+        f"Session #{next(get_session_counter())} ready in {(time.time() - session_start) * 1000:.1f} ms "
+        f"(shared knowledge base {knowledge_base.memory_usage()['total'] / 1024 ** 2:.1f} MB)"
+    )
 
 if 'conversation_manager' not in st.session_state:
     st.session_state.conversation_manager = ConversationManager()
 
 if 'response_generator' not in st.session_state:
-    st.session_state.response_generator = ResponseGenerator(st.session_state.knowledge_base)
+    st.session_state.response_generator = get_engine().response_generator()
 
 # UI Components
 def render_chat_message(role: str, content: str):
@@ -669,29 +301,44 @@ with st.sidebar:
     """, unsafe_allow_html=True)
     
     # System Status
-    st.markdown("""
+    if knowledge_base.semantic_ready:
+        status_color, status_text = "#4ade80", "🟢 System Online"
+    elif get_engine().model_status == 'failed':
+        status_color, status_text = "#f87171", "🔴 AI Model Unavailable (quick answers only)"
+    else:
+        status_color, status_text = "#facc15", "🟡 Loading AI Model (quick answers available)"
+    last_reload = get_engine().last_reload
+    reload_note = f" · reloaded in {last_reload['seconds']:.1f}s" if last_reload.get('status') == 'ok' else ""
+    st.markdown(f"""
     <div style="background: var(--glass-bg); border-radius: 15px; padding: 1rem; margin: 1rem 0; border: 1px solid var(--glass-border);">
-        <h4 style="color: #4ade80; margin: 0;">🟢 System Online</h4>
+        <h4 style="color: {status_color}; margin: 0;">{status_text}</h4>
         <p style="color: var(--text-secondary); font-size: 0.9rem; margin: 0.5rem 0 0 0;">
             AI-powered IT Helpdesk chatbot for Honda Cars India
         </p>
+        <p style="color: var(--text-secondary); font-size: 0.8rem; margin: 0.5rem 0 0 0;">
+            Knowledge base {knowledge_base.version} · {len(knowledge_base.questions)} entries{reload_note}
+        </p>
     </div>
     """, unsafe_allow_html=True)
     
     # Quick Stats
     if st.session_state.conversation_manager.conversation_history:
         msg_count = len([m for m in st.session_state.conversation_manager.conversation_history if m['role'] == 'user'])
+        cache_stats = get_engine().response_cache.stats()
+        search_stats = knowledge_base.search_stats()
         st.markdown(f"""
         <div style="background: var(--glass-bg); border-radius: 12px; padding: 0.8rem; margin: 1rem 0; border: 1px solid var(--glass-border);">
             <p style="margin: 0; font-size: 0.9rem; color: var(--text-secondary);">Messages: {msg_count}</p>
             <p style="margin: 0; font-size: 0.9rem; color: var(--text-secondary);">Response Time: ~1.2s</p>
+            <p style="margin: 0; font-size: 0.9rem; color: var(--text-secondary);">Cache Hit Rate: {cache_stats['hit_rate']:.0%} ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})</p>
+            <p style="margin: 0; font-size: 0.9rem; color: var(--text-secondary);">Fast Path: {search_stats['fast_path_rate']:.0%} of searches (~{search_stats['saved_ms']:.0f} ms saved)</p>
         </div>
         """, unsafe_allow_html=True)
     
     # Categories
-    if st.session_state.knowledge_base.categories:
+    if knowledge_base.categories:
         st.markdown("### 📂 Categories")
-        for category in sorted(st.session_state.knowledge_base.categories):
+        for category in sorted(knowledge_base.categories):
             st.markdown(f"- {category}")
     
     st.markdown("---")
@@ -722,14 +369,14 @@ if not st.session_state.conversation_manager.conversation_history:
     """, unsafe_allow_html=True)
     
     # Quick Reply Buttons
-    quick_replies = ["Reset Password", "VPN Issues", "Software Install", "Hardware Problems"]
-    cols = st.columns(len(quick_replies))
+    cols = st.columns(len(config.QUICK_REPLIES))
     
-    for col, reply in zip(cols, quick_replies):
+    for col, reply in zip(cols, config.QUICK_REPLIES):
         with col:
             if st.button(reply, use_container_width=True):
                 # Process quick reply
                 response_data = st.session_state.response_generator.generate_response(reply)
+                record_startup_metric('first_semantic_answer', response_data)
                 
                 # Add to conversation
                 st.session_state.conversation_manager.add_message("user", reply)
@@ -773,6 +420,7 @@ with st.form("chat_input", clear_on_submit=True):
                     user_input, 
                     st.session_state.conversation_manager.get_context()
                 )
+                record_startup_metric('first_semantic_answer', response_data)
                 
                 # Add messages to conversation
                 st.session_state.conversation_manager.add_message("user", user_input)
@@ -788,3 +436,6 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# Startup Metrics
+record_startup_metric('first_paint')
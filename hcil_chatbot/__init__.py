@@ -0,0 +1,30 @@
+"""Retrieval and response engine of the HCIL IT-Helpdesk chatbot, independent of any UI.
+
+Importing the package is cheap: pandas, fuzzywuzzy and the model libraries
+are only imported when a knowledge base or model is actually loaded.
+"""
+from . import config
+from .conversation import ConversationManager
+from .engine import ChatEngine, attach_model, build_knowledge_base, build_query_encoder, precompute_responses
+from .knowledge_base import EnhancedKnowledgeBase, KnowledgeBaseHolder
+from .model_loader import BackgroundModelLoader
+from .models import get_model_version, load_model
+from .response_cache import ResponseCache
+from .response_generator import ResponseGenerator
+
+__all__ = [
+    'config',
+    'BackgroundModelLoader',
+    'ChatEngine',
+    'ConversationManager',
+    'EnhancedKnowledgeBase',
+    'KnowledgeBaseHolder',
+    'ResponseCache',
+    'ResponseGenerator',
+    'attach_model',
+    'build_knowledge_base',
+    'build_query_encoder',
+    'get_model_version',
+    'load_model',
+    'precompute_responses'
+]
@@ -0,0 +1,367 @@
+"""Asynchronous HTTP API over the chat engine.
+
+Endpoints:
+    GET  /health      engine and model state
+    GET  /stats       queue, cache and search counters
+    POST /chat        {"query": "...", "context": [...]} -> one response
+    POST /chat/batch  {"queries": ["...", ...]} -> {"responses": [...]}
+
+Both chat endpoints take optional "category" (a string) and "tags" (a list
+of strings) to answer only from matching knowledge base entries.
+
+Requests are admitted into a bounded queue drained by a fixed number of
+worker tasks, each running generate_response on a thread pool so the event
+loop never blocks on search or encoding. A full queue rejects new work with
+503 and Retry-After instead of letting latency grow without bound.
+
+With --processes N the server pre-forks: the parent loads the knowledge base
+and the model once, binds the socket and forks N worker processes that accept
+on it. Workers share the parent's memory-mapped embeddings, row arrays and
+indexes copy-on-write instead of each building its own knowledge base, so
+throughput scales past one core without multiplying the memory footprint.
+
+Usage: python -m hcil_chatbot.api [--host 127.0.0.1] [--port 8000] [--workers 4] [--queue-size 256]
+                                  [--processes 1]
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from . import config
+from .engine import ChatEngine
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the service cannot accept more queries"""
+
+
+class ChatService:
+    """Bounded asynchronous front end for a ChatEngine
+
+    ``submit`` queues a query and returns a future; ``workers`` tasks take
+    queries off the queue and run them on a thread pool of the same size, so
+    at most ``workers`` responses are generated at once and at most
+    ``queue_size`` wait behind them. Concurrent queries reach the encoder
+    together, where the micro-batching service groups them into one forward
+    pass.
+    """
+    
+    def __init__(self, engine: ChatEngine, workers: int = 4, queue_size: int = 256):
+        self.engine = engine
+        self.generator = engine.response_generator()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    async def start(self):
+        """Start the worker tasks on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='chat-worker')
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        """Cancel the workers and shut the thread pool down"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+    
+    async def _work(self):
+        """Answer queued queries one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            query, context, filters, future = await self._queue.get()
+            try:
+                # Callers that timed out have cancelled their future; skip their work
+                if not future.done():
+                    response = await loop.run_in_executor(
+                        self._executor, partial(self.generator.generate_response, query, context, **filters)
+                    )
+                    if not future.done():
+                        future.set_result(response)
+                    self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error answering query: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+    
+    def submit(self, queries: List[Tuple[str, Optional[List[Dict]]]],
+               filters: Optional[Dict] = None) -> List[asyncio.Future]:
+        """Queue (query, context) pairs, all or none, and return a future per query
+        
+        ``filters`` holds the category and tags keyword arguments of
+        generate_response and applies to every query.
+        """
+        if self._queue.qsize() + len(queries) > self.queue_size:
+            self.rejected += len(queries)
+            raise QueueFullError(f"{self._queue.qsize()} queries already queued")
+        loop = asyncio.get_running_loop()
+        futures = []
+        for query, context in queries:
+            future = loop.create_future()
+            self._queue.put_nowait((query, context, filters or {}, future))
+            futures.append(future)
+        return futures
+    
+    def stats(self) -> Dict[str, int]:
+        """Get queue and throughput counters"""
+        return {
+            'pid': os.getpid(),
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected
+        }
+
+
+def error(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """Build a JSON error response"""
+    return JSONResponse({'error': message}, status_code=status, headers=headers)
+
+
+def read_filters(body: Dict) -> Optional[Dict]:
+    """Get the category and tags filters of a request body, or None if they are malformed"""
+    category, tags = body.get('category'), body.get('tags')
+    if category is not None and not isinstance(category, str):
+        return None
+    if tags is not None and not (isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+        return None
+    return {'category': category, 'tags': tags}
+
+
+async def read_json(request: Request) -> Optional[Dict]:
+    """Parse a JSON object body, or None if it is not one"""
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def create_app(engine: Optional[ChatEngine] = None, workers: Optional[int] = None,
+               queue_size: Optional[int] = None, timeout: Optional[float] = None) -> Starlette:
+    """Build the ASGI app; the engine is created at startup unless one is given"""
+    timeout = timeout or config.API_REQUEST_TIMEOUT
+    
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        # Loading the knowledge base is blocking work, keep it off the event loop
+        chat_engine = engine or await asyncio.get_running_loop().run_in_executor(None, ChatEngine)
+        if not chat_engine.loaded:
+            raise RuntimeError("Failed to load knowledge base")
+        app.state.service = ChatService(
+            chat_engine, workers or config.API_WORKERS, queue_size or config.API_QUEUE_SIZE
+        )
+        await app.state.service.start()
+        yield
+        await app.state.service.stop()
+    
+    async def answer(service: ChatService, queries: List[Tuple[str, Optional[List[Dict]]]], filters: Dict,
+                     batch: bool) -> JSONResponse:
+        try:
+            futures = service.submit(queries, filters)
+        except QueueFullError as e:
+            return error(503, f"Server busy: {e}", headers={'Retry-After': '1'})
+        try:
+            responses = await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except asyncio.TimeoutError:
+            return error(504, f"No response within {timeout:.0f}s")
+        except Exception:
+            return error(500, "Error generating response")
+        return JSONResponse({'responses': responses} if batch else responses[0])
+    
+    async def chat(request: Request) -> JSONResponse:
+        body = await read_json(request)
+        if body is None or not isinstance(body.get('query'), str) or not body['query'].strip():
+            return error(400, "Expected a JSON object with a non-empty 'query' string")
+        context = body.get('context')
+        if context is not None and not isinstance(context, list):
+            return error(400, "'context' must be a list of messages")
+        filters = read_filters(body)
+        if filters is None:
+            return error(400, "'category' must be a string and 'tags' a list of strings")
+        return await answer(request.app.state.service, [(body['query'], context)], filters, batch=False)
+    
+    async def chat_batch(request: Request) -> JSONResponse:
+        body = await read_json(request)
+        queries = body.get('queries') if body is not None else None
+        if not isinstance(queries, list) or not queries or not all(isinstance(q, str) for q in queries):
+            return error(400, "Expected a JSON object with a non-empty 'queries' list of strings")
+        # A batch larger than the whole queue could never be admitted, so retrying would not help
+        max_batch_size = min(config.API_MAX_BATCH_SIZE, request.app.state.service.queue_size)
+        if len(queries) > max_batch_size:
+            return error(413, f"At most {max_batch_size} queries per batch")
+        filters = read_filters(body)
+        if filters is None:
+            return error(400, "'category' must be a string and 'tags' a list of strings")
+        return await answer(request.app.state.service, [(query, None) for query in queries], filters, batch=True)
+    
+    async def health(request: Request) -> JSONResponse:
+        service: ChatService = request.app.state.service
+        return JSONResponse({
+            'status': 'ok',
+            'model': service.engine.model_status,
+            'semantic_ready': service.engine.knowledge_base.semantic_ready,
+            'knowledge_base_version': service.engine.knowledge_base.version
+        })
+    
+    async def stats(request: Request) -> JSONResponse:
+        service: ChatService = request.app.state.service
+        return JSONResponse({
+            'service': service.stats(),
+            'response_cache': service.engine.response_cache.stats(),
+            'knowledge_base': service.engine.reload_stats(),
+            'search': service.engine.knowledge_base.search_stats()
+        })
+    
+    return Starlette(
+        routes=[
+            Route('/health', health, methods=['GET']),
+            Route('/stats', stats, methods=['GET']),
+            Route('/chat', chat, methods=['POST']),
+            Route('/chat/batch', chat_batch, methods=['POST'])
+        ],
+        lifespan=lifespan
+    )
+
+
+def serve_forked(engine: ChatEngine, host: str, port: int, processes: int, **app_options):
+    """Serve a fully loaded engine from pre-forked worker processes until SIGINT or SIGTERM
+    
+    Workers that die are replaced by forking the parent again, which is
+    cheap because nothing has to be loaded twice. The parent alone watches
+    the knowledge base file; after a reload it replaces every worker so they
+    serve the new version.
+    """
+    import uvicorn
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    
+    # Keep the loaded objects out of the collector, whose passes would touch and copy shared pages
+    gc.collect()
+    gc.freeze()
+    
+    def spawn() -> int:
+        pid = os.fork()
+        if pid:
+            return pid
+        status = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if 'torch' in sys.modules:
+                # Split the cores between workers instead of oversubscribing them
+                sys.modules['torch'].set_num_threads(max(1, (os.cpu_count() or 1) // processes))
+            engine.after_fork()
+            app = create_app(engine, **app_options)
+            uvicorn.Server(uvicorn.Config(app, log_level='warning')).run(sockets=[sock])
+        except Exception as e:
+            logger.error(f"Worker {os.getpid()} failed: {e}")
+            status = 1
+        finally:
+            # Skip the parent's exit handlers, such as persisting caches it owns
+            os._exit(status)
+    
+    children = {spawn() for _ in range(processes)}
+    logger.info(f"Serving on http://{host}:{port} with {processes} processes: {sorted(children)}")
+    stopping = False
+    retiring = set()
+    
+    def recycle():
+        # Workers hold the old version; stop them gracefully and the loop below forks
+        # replacements from the reloaded parent. The socket queues connections meanwhile.
+        gc.collect()
+        gc.freeze()
+        for pid in list(children):
+            retiring.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    engine.on_reload(recycle)
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            if pid not in retiring:
+                logger.warning(f"Worker {pid} exited with status {status}, restarting it")
+            retiring.discard(pid)
+            children.add(spawn())
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--port', type=int, default=config.API_PORT)
+    parser.add_argument('--workers', type=int, default=config.API_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=config.API_QUEUE_SIZE)
+    parser.add_argument('--timeout', type=float, default=config.API_REQUEST_TIMEOUT)
+    parser.add_argument('--processes', type=int, default=config.API_PROCESSES)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    app_options = {'workers': args.workers, 'queue_size': args.queue_size, 'timeout': args.timeout}
+    if args.processes > 1:
+        # Everything is loaded before forking, so workers start with semantic search ready
+        engine = ChatEngine(load_model_in_background=False)
+        if not engine.loaded:
+            sys.exit("Failed to load knowledge base")
+        engine.load_model_now()
+        serve_forked(engine, args.host, args.port, args.processes, **app_options)
+        return
+    
+    import uvicorn
+    
+    app = create_app(**app_options)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compile the knowledge base spreadsheet into a binary artifact that loads in milliseconds.
+
+The spreadsheet stays the authoring format. ``build`` parses it once and
+writes the cleaned text columns, category and tag dictionaries, the fuzzy
+index and, unless --no-embeddings is given, the embeddings and vector index
+to config.KB_ARTIFACT_DIR. At startup the engine loads the artifact instead of
+the spreadsheet whenever it was built from the current spreadsheet. ``check``
+exits with status 1 when the artifact is missing or stale, for use in CI or a
+pre-commit hook.
+
+Usage: python -m hcil_chatbot.artifact build [--source dataset.xlsx] [--output cache/kb] [--no-embeddings]
+       python -m hcil_chatbot.artifact check [--source dataset.xlsx] [--output cache/kb]
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import time
+
+from . import config
+from .compiled_kb import check_artifact, source_digest
+from .knowledge_base import EnhancedKnowledgeBase
+
+logger = logging.getLogger(__name__)
+
+
+def build_artifact(source_path: str, directory: str, with_embeddings: bool = True) -> bool:
+    """Compile the source file into the artifact directory, replacing it only once complete"""
+    start_time = time.time()
+    model = None
+    if with_embeddings:
+        from .models import load_model
+        model = load_model()
+    
+    knowledge_base = EnhancedKnowledgeBase(model)
+    if not knowledge_base.load_data(source_path):
+        return False
+    
+    # Build next to the target and swap directories, so readers never see a partial artifact
+    tmp_directory = f"{directory}.tmp-{os.getpid()}"
+    old_directory = f"{directory}.old-{os.getpid()}"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    try:
+        knowledge_base.save_compiled(tmp_directory, source_path, source_digest(source_path))
+        if os.path.exists(directory):
+            os.replace(directory, old_directory)
+        os.replace(tmp_directory, directory)
+    finally:
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        shutil.rmtree(old_directory, ignore_errors=True)
+    
+    logger.info(
+        f"Compiled {source_path} ({len(knowledge_base.questions)} rows, version {knowledge_base.version}) "
+        f"into {directory} in {time.time() - start_time:.2f}s"
+    )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['build', 'check'])
+    parser.add_argument('--source', default=config.KNOWLEDGE_BASE_PATH)
+    parser.add_argument('--output', default=config.KB_ARTIFACT_DIR)
+    parser.add_argument('--no-embeddings', action='store_true', help='compile the text columns and fuzzy index only')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    if args.command == 'build':
+        sys.exit(0 if build_artifact(args.source, args.output, with_embeddings=not args.no_embeddings) else 1)
+    
+    problem = check_artifact(args.source, args.output, strict=not args.no_embeddings)
+    if problem is not None:
+        sys.exit(f"Stale knowledge base artifact: {problem}; run python -m hcil_chatbot.artifact build")
+    print(f"{args.output} is up to date with {args.source}")
+
+
+if __name__ == '__main__':
+    main()
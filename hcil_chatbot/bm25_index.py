@@ -0,0 +1,142 @@
+import os
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric terms"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Sparse BM25 index over several text fields of every row
+
+    Term frequencies and row lengths are summed over the fields, each scaled
+    by its weight (a simplified BM25F), so a term in the question can count
+    for more than the same term in the answer. The index is an inverted file
+    in CSR form: postings of term ``t`` are ``rows[offsets[t]:offsets[t + 1]]``
+    with their BM25 contributions precomputed in ``weights``. A query gathers
+    the postings of its terms and sums them per row with one ``np.bincount``,
+    so only rows sharing a term with the query are touched.
+    """
+    
+    def __init__(self, fields: Sequence[Sequence[str]], field_weights: Sequence[float],
+                 k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_rows = len(fields[0]) if fields else 0
+        self.vocabulary: Dict[str, int] = {}
+        
+        # Weighted term frequency of every (term, row) pair, and the weighted length of every row
+        frequencies: Dict[Tuple[int, int], float] = {}
+        lengths = np.zeros(self.n_rows, dtype=np.float64)
+        for texts, weight in zip(fields, field_weights):
+            if not weight:
+                continue
+            for row, text in enumerate(texts):
+                terms = tokenize(text)
+                lengths[row] += weight * len(terms)
+                for term in terms:
+                    term_id = self.vocabulary.setdefault(term, len(self.vocabulary))
+                    frequencies[term_id, row] = frequencies.get((term_id, row), 0.0) + weight
+        
+        pairs = np.array(list(frequencies), dtype=np.int64).reshape(-1, 2)
+        tf = np.fromiter(frequencies.values(), dtype=np.float64, count=len(frequencies))
+        order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+        term_ids, rows, tf = pairs[order, 0], pairs[order, 1], tf[order]
+        
+        document_frequency = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.idf = np.log1p((self.n_rows - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        mean_length = lengths.mean() if self.n_rows and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths[rows] / mean_length)
+        self.rows = rows.astype(np.int32)
+        self.weights = (self.idf[term_ids] * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+        self.offsets = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+    
+    def __len__(self) -> int:
+        return self.n_rows
+    
+    def subset(self, rows: np.ndarray) -> 'BM25Index':
+        """Get an index over some rows only, numbered by their position in rows
+
+        Term weights keep the statistics of the whole knowledge base, so a
+        row scores the same in a slice as in a full search.
+        """
+        position = np.full(self.n_rows, -1, dtype=np.int32)
+        position[rows] = np.arange(len(rows), dtype=np.int32)
+        new_rows = position[self.rows]
+        keep = new_rows >= 0
+        term_ids = np.repeat(np.arange(len(self.idf)), np.diff(self.offsets))
+        
+        index = BM25Index.__new__(BM25Index)
+        index.k1, index.b = self.k1, self.b
+        index.n_rows = len(rows)
+        index.vocabulary = self.vocabulary
+        index.idf = self.idf
+        index.rows = new_rows[keep]
+        index.weights = self.weights[keep]
+        index.offsets = np.concatenate(([0], np.cumsum(np.bincount(term_ids[keep], minlength=len(self.idf)))))
+        return index
+    
+    def save(self, path: str):
+        """Persist the postings so loading skips tokenizing"""
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            terms=np.array(' '.join(terms)),
+            params=np.array([self.k1, self.b, self.n_rows], dtype=np.float64),
+            idf=self.idf,
+            rows=self.rows,
+            weights=self.weights,
+            offsets=self.offsets
+        )
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'BM25Index':
+        """Load an index written by save"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls.__new__(cls)
+            k1, b, n_rows = data['params']
+            index.k1, index.b, index.n_rows = float(k1), float(b), int(n_rows)
+            index.vocabulary = {term: i for i, term in enumerate(str(data['terms']).split())}
+            index.idf = data['idf']
+            index.rows = data['rows']
+            index.weights = data['weights']
+            index.offsets = data['offsets']
+        return index
+    
+    def scores(self, query: str) -> Tuple[np.ndarray, float]:
+        """Get the BM25 score of every row and the highest score any row could reach"""
+        term_ids = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+        if not term_ids:
+            return np.zeros(self.n_rows, dtype=np.float32), 0.0
+        postings = [slice(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        rows = np.concatenate([self.rows[p] for p in postings])
+        weights = np.concatenate([self.weights[p] for p in postings])
+        # A row's weight for a term never exceeds idf * (k1 + 1)
+        ceiling = float(self.idf[term_ids].sum() * (self.k1 + 1))
+        return np.bincount(rows, weights=weights, minlength=self.n_rows), ceiling
+    
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """Get (row, score) pairs of the top_k matching rows, best first, ties in row order
+
+        Scores are divided by the highest score the query could reach, so
+        they fall between 0 and 1. Rows sharing no term with the query are
+        never returned.
+        """
+        scores, ceiling = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if top_k <= 0 or not len(matched):
+            return []
+        if top_k < len(matched):
+            # Keep every row tied with the k-th best so ties still break in row order
+            kth = np.partition(-scores[matched], top_k - 1)[top_k - 1]
+            matched = matched[-scores[matched] <= kth]
+        matched = matched[np.lexsort((matched, -scores[matched]))][:top_k]
+        return [(int(row), float(scores[row] / ceiling)) for row in matched]
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from . import config
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def read_artifact_header(directory: str) -> Optional[Dict]:
+    """Read the header of a compiled knowledge base, or None if there is no complete one"""
+    try:
+        with open(os.path.join(directory, 'header.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def source_digest(path: str) -> str:
+    """Get the SHA-256 digest of a source file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_artifact(source_path: str, directory: str, strict: bool = False) -> Optional[str]:
+    """Get why the artifact cannot stand in for the source file, or None if it is up to date
+
+    By default only the content is checked, which is what loading needs;
+    embeddings built for another model or settings are simply re-encoded at
+    load. ``strict`` also requires the embeddings to match the current
+    configuration.
+    """
+    header = read_artifact_header(directory)
+    if header is None:
+        return f"no compiled knowledge base in {directory}"
+    if header.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        return f"artifact format {header.get('format_version')} is not {ARTIFACT_FORMAT_VERSION}"
+    if not os.path.exists(source_path):
+        return f"source file {source_path} not found"
+    if header.get('source_sha256') != source_digest(source_path):
+        return f"{source_path} changed since the artifact was built at {header.get('built_at')}"
+    if strict:
+        expected = {
+            'model_name': config.MODEL_NAME,
+            'embeddings_dtype': config.EMBEDDINGS_DTYPE,
+            'index_backend': config.INDEX_BACKEND
+        }
+        for key, value in expected.items():
+            if header.get(key) != value:
+                return f"artifact {key} is {header.get(key)}, configuration says {value}"
+        if config.MULTI_FIELD_SEARCH and 'answers' not in header.get('embedding_fields', ['questions', 'answers']):
+            return "artifact has no answer embeddings, configuration enables MULTI_FIELD_SEARCH"
+    return None
@@ -0,0 +1,69 @@
+import os
+
+# Engine configuration; clients may also assign to these (e.g. config.INDEX_BACKEND = 'ivf')
+# before building a knowledge base, since every value is read when it is used
+KNOWLEDGE_BASE_PATH = 'dataset.xlsx'
+CACHE_DIR = 'cache'
+KB_ARTIFACT_DIR = os.path.join(CACHE_DIR, 'kb')  # compiled KNOWLEDGE_BASE_PATH, see hcil_chatbot.artifact
+EMBEDDINGS_CACHE_DIR = os.path.join(CACHE_DIR, 'embeddings')
+MODEL_NAME = "all-MiniLM-L6-v2"
+ENCODER_BACKEND = 'torch'  # 'onnx' runs an exported (int8-quantized) graph on ONNX Runtime
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, 'onnx')
+ONNX_QUANTIZE = True
+EMBEDDINGS_DTYPE = 'float32'  # 'float16' halves the on-disk and mapped size; scoring upcasts it in chunks
+INDEX_BACKEND = 'exact'  # 'ivf' for approximate search over very large knowledge bases
+IVF_N_LISTS = None  # None picks 4 * sqrt(rows)
+IVF_N_PROBE = 8  # lists scanned per query; higher is slower but closer to exact
+RESPONSE_CACHE_SIZE = 2048
+RESPONSE_CACHE_TTL = 3600  # seconds
+KB_HOT_RELOAD = True  # watch KNOWLEDGE_BASE_PATH and swap in edited versions while serving
+KB_WATCH_INTERVAL = 2.0  # seconds between checks of the file
+KB_LOAD_RETRY_INTERVAL = 10.0  # seconds a page load waits after a failed load before trying again
+
+# Hybrid search: rank-based fusion of semantic and fuzzy results
+FUSION_DEPTH = 10  # candidates taken from each method before fusing
+RRF_K = 60  # reciprocal rank fusion damping; larger flattens the rank weights
+FUZZY_EARLY_EXIT_SCORE = 90  # token_sort_ratio at or above which the model encode is skipped
+
+# Multi-field semantic search: score queries against answers as well as questions.
+# When off, answers are never encoded.
+MULTI_FIELD_SEARCH = False
+FIELD_WEIGHTS = {'questions': 0.7, 'answers': 0.3}  # scaled to sum to 1
+
+# BM25 lexical search (method 'bm25'), also the candidate generator of method 'rerank'
+BM25_FIELD_WEIGHTS = {'questions': 2.0, 'answers': 1.0, 'tags': 1.0}  # term frequency multipliers
+BM25_K1 = 1.2  # term frequency saturation
+BM25_B = 0.75  # row length normalization
+RERANK_CANDIDATES = 50  # BM25 candidates re-scored with embeddings by method 'rerank'
+HYBRID_BM25 = True  # fuse BM25 results into hybrid search alongside semantic and fuzzy
+
+# Filtered search: restrict every answer to a category and/or any of some tags
+# (e.g. SEARCH_CATEGORY = 'Hardware Support' for a department-scoped deployment)
+SEARCH_CATEGORY = None
+SEARCH_TAGS = None  # list of tags, matched individually against the comma-separated tags column
+FILTER_SLICE_CACHE_SIZE = 256  # filter combinations whose row slices and sub-indexes are kept
+
+# Queries answered once at load time and served from a precomputed table
+QUICK_REPLIES = ["Reset Password", "VPN Issues", "Software Install", "Hardware Problems"]
+FREQUENT_QUERIES = [
+    "reset password", "unlock account", "vpn not connecting", "wifi not working",
+    "outlook not syncing", "printer not working", "install software", "laptop slow",
+    "sap login issue", "forgot password"
+]
+PRECOMPUTE_TOP_N = 20
+
+# Query encoding: group concurrent queries into one forward pass
+ENCODER_MICRO_BATCHING = True
+ENCODER_MAX_BATCH_SIZE = 32
+ENCODER_MAX_WAIT_MS = 5
+QUERY_EMBEDDING_CACHE_SIZE = 10000
+QUERY_EMBEDDING_CACHE_PERSIST = True  # keep query vectors across restarts
+
+# HTTP API (python -m hcil_chatbot.api)
+API_HOST = '127.0.0.1'
+API_PORT = 8000
+API_WORKERS = 4  # threads running generate_response; encoding releases the GIL
+API_PROCESSES = 1  # pre-forked server processes sharing one loaded knowledge base
+API_QUEUE_SIZE = 256  # queued queries beyond which requests are rejected with 503
+API_MAX_BATCH_SIZE = 64
+API_REQUEST_TIMEOUT = 10.0  # seconds
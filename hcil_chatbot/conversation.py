@@ -0,0 +1,42 @@
+import html
+from datetime import datetime
+from typing import Dict, List
+
+
+class ConversationManager:
+    """Manages conversation context and history"""
+    
+    def __init__(self, max_history: int = 10):
+        self.max_history = max_history
+        self.conversation_history = []
+        self.context_window = []
+    
+    def add_message(self, role: str, content: str, timestamp: datetime = None):
+        """Add a message to conversation history"""
+        if timestamp is None:
+            timestamp = datetime.now()
+        
+        # Sanitize content for security
+        sanitized_content = html.escape(content)
+        
+        message = {
+            'role': role,
+            'content': sanitized_content,
+            'timestamp': timestamp
+        }
+        
+        self.conversation_history.append(message)
+        
+        # Maintain context window
+        if len(self.context_window) >= self.max_history:
+            self.context_window.pop(0)
+        self.context_window.append(message)
+    
+    def get_context(self) -> List[Dict]:
+        """Get recent conversation context"""
+        return self.context_window[-5:] if len(self.context_window) > 5 else self.context_window
+    
+    def clear_history(self):
+        """Clear conversation history"""
+        self.conversation_history.clear()
+        self.context_window.clear()
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 2
+
+
+class EmbeddingStore:
+    """Content-addressed on-disk cache of text embeddings
+
+    Every text is keyed by a SHA-256 digest of the model name, model version and
+    the text itself, so cached vectors stay valid across restarts and only new or
+    edited texts have to be encoded.
+
+    A store is kept as three files: a raw row-major matrix (``<name>.f32`` or
+    ``<name>.f16``), a JSON header describing its shape and dtype, and an
+    ``<name>.ids`` sidecar holding one fixed-width key per row. The matrix is
+    opened with ``np.memmap``, so processes on the same host share the page
+    cache instead of each holding a private copy. The header records a
+    checksum of the other two files, so a matrix and sidecar left by two
+    different writers are treated as a miss rather than served.
+    """
+    
+    def __init__(self, cache_dir: str, name: str, model_name: str, model_version: str,
+                 dtype: str = 'float32'):
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        self.cache_dir = cache_dir
+        self.name = name
+        self.model_name = model_name
+        self.model_version = model_version
+        self.dtype = np.dtype(dtype)
+        self.matrix_path = os.path.join(cache_dir, f"{name}.f{self.dtype.itemsize * 8}")
+        self.header_path = os.path.join(cache_dir, f"{name}.json")
+        self.ids_path = os.path.join(cache_dir, f"{name}.ids")
+        self.matrix: Optional[np.ndarray] = None
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+    
+    def key(self, text: str) -> str:
+        """Get the stable cache key for a text"""
+        payload = f"{self.model_name}\0{self.model_version}\0{text}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+    
+    @staticmethod
+    def _checksum(keys: np.ndarray, matrix: Optional[np.ndarray]) -> str:
+        """Get a digest of the sidecar and matrix contents"""
+        digest = hashlib.sha256(keys.tobytes())
+        if matrix is not None:
+            digest.update(matrix)
+        return digest.hexdigest()
+    
+    def _load(self):
+        """Map previously stored vectors without reading them into memory"""
+        if not os.path.exists(self.header_path):
+            return
+        try:
+            with open(self.header_path, 'r', encoding='utf-8') as f:
+                header = json.load(f)
+            if header.get('format_version') != STORE_FORMAT_VERSION or header.get('dtype') != self.dtype.name:
+                logger.info(f"Ignoring embedding store {self.name} written with a different format or dtype")
+                return
+            
+            rows, dim = int(header['rows']), int(header['dim'])
+            keys = np.fromfile(self.ids_path, dtype='S64')
+            expected_size = rows * dim * self.dtype.itemsize
+            if len(keys) != rows or os.path.getsize(self.matrix_path) != expected_size:
+                logger.warning(f"Embedding store {self.name} is incomplete, rebuilding it")
+                return
+            
+            matrix = np.memmap(self.matrix_path, dtype=self.dtype, mode='r', shape=(rows, dim)) if rows else None
+            if header.get('checksum') != self._checksum(keys, matrix):
+                logger.warning(f"Embedding store {self.name} files do not match its header, rebuilding it")
+                return
+            
+            self.matrix = matrix
+            self.keys = [key.decode('ascii') for key in keys]
+            self.rows = {key: row for row, key in enumerate(self.keys)}
+        except Exception as e:
+            logger.warning(f"Failed to load embedding store {self.name}: {e}")
+            self.matrix = None
+            self.keys = []
+            self.rows = {}
+    
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Get embeddings aligned with texts, encoding only the ones missing from the store"""
+        keys = [self.key(text) for text in texts]
+        
+        # Fast path: the stored rows are exactly the requested ones, serve the mapping as is
+        if keys == self.keys and self.matrix is not None:
+            self.hits += len(keys)
+            return self.matrix
+        
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self.rows and key not in missing:
+                missing[key] = text
+        self.misses += sum(1 for key in keys if key in missing)
+        self.hits += len(keys) - sum(1 for key in keys if key in missing)
+        
+        encoded: Dict[str, np.ndarray] = {}
+        if missing:
+            vectors = np.asarray(encode_fn(list(missing.values())), dtype=self.dtype)
+            encoded = dict(zip(missing.keys(), vectors))
+        
+        if not keys:
+            return np.empty((0, 0), dtype=self.dtype)
+        matrix = np.stack([encoded[key] if key in encoded else self.matrix[self.rows[key]] for key in keys])
+        
+        # Rewrite the store in request order so the next start can map it directly
+        try:
+            self.write(keys, matrix)
+        except Exception as e:
+            logger.warning(f"Failed to cache embeddings for {self.name}: {e}")
+            return matrix
+        return self.matrix
+    
+    def items(self):
+        """Iterate over stored (key, vector) pairs"""
+        for row, key in enumerate(self.keys):
+            yield key, self.matrix[row]
+    
+    def write(self, keys: List[str], matrix: np.ndarray):
+        """Replace the stored matrix, sidecar and header"""
+        matrix = np.ascontiguousarray(matrix, dtype=self.dtype)
+        ids = np.array(keys, dtype='S64')
+        
+        # The header goes last and checksums the other two files: each file is swapped in atomically, but
+        # worker processes on one host may rewrite the store at once, and a reader must not pair one
+        # writer's sidecar with another's matrix
+        try:
+            os.remove(self.header_path)
+        except FileNotFoundError:
+            pass
+        
+        suffix = f"tmp-{os.getpid()}"
+        tmp_matrix_path = f"{self.matrix_path}.{suffix}"
+        matrix.tofile(tmp_matrix_path)
+        # Map this writer's own file before it is moved, so another writer's swap cannot be mapped instead
+        mapped = np.memmap(tmp_matrix_path, dtype=self.dtype, mode='r', shape=matrix.shape)
+        os.replace(tmp_matrix_path, self.matrix_path)
+        
+        tmp_ids_path = f"{self.ids_path}.{suffix}"
+        ids.tofile(tmp_ids_path)
+        os.replace(tmp_ids_path, self.ids_path)
+        
+        header = {
+            'format_version': STORE_FORMAT_VERSION,
+            'model_name': self.model_name,
+            'model_version': self.model_version,
+            'dtype': self.dtype.name,
+            'rows': int(matrix.shape[0]),
+            'dim': int(matrix.shape[1]),
+            'checksum': self._checksum(ids, matrix)
+        }
+        tmp_header_path = f"{self.header_path}.{suffix}"
+        with open(tmp_header_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_header_path, self.header_path)
+        
+        self.matrix = mapped
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+    
+    def fingerprint(self) -> str:
+        """Get a digest identifying the exact rows currently stored, in order"""
+        return hashlib.sha256(''.join(self.keys).encode('ascii')).hexdigest()
+    
+    def stats(self) -> Dict[str, int]:
+        """Get cache hit and miss counts since startup"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.keys)}
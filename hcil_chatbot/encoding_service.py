@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BatchEncodingService:
+    """Micro-batching front end for a SentenceTransformer-like encoder
+
+    Callers from any thread submit texts and block on the result. A single
+    worker thread takes the first pending request, keeps collecting requests
+    for up to ``max_wait_ms`` (or until ``max_batch_size`` texts are queued),
+    runs one ``encode`` call for the whole batch and hands every caller its
+    own rows back. Concurrent sessions therefore share forward passes instead
+    of each running a batch of one. The window is only waited out under
+    concurrency, when other requests are already queued or the last batch
+    served several callers; a lone caller is encoded right away.
+    """
+    
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._requests: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self._last_batch_requests = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='batch-encoder', daemon=True)
+        self._worker.start()
+    
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Encode texts, waiting for the batch they were grouped into"""
+        return self.submit(texts).result()
+    
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for encoding and return a future for their embeddings"""
+        if self._closed:
+            raise RuntimeError("Encoding service is closed")
+        future: Future = Future()
+        self._requests.put((list(texts), future))
+        return future
+    
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        """Wait for a request, then gather more until the batch is full or the deadline passes"""
+        batch = [self._requests.get()]
+        size = len(batch[0][0] or [])
+        deadline = time.perf_counter() + self.max_wait
+        # Take whatever is already queued, and skip the wait when nothing suggests more is coming
+        while size < self.max_batch_size:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request[0] or [])
+        if len(batch) > 1 or self._last_batch_requests > 1:
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0] or [])
+        self._last_batch_requests = len(batch)
+        return batch
+    
+    def _run(self):
+        """Worker loop encoding one batch at a time"""
+        while True:
+            batch = self._collect()
+            stopping = any(texts is None for texts, _ in batch)
+            batch = [request for request in batch
+                     if request[0] is not None and request[1].set_running_or_notify_cancel()]
+            if batch:
+                self._encode_batch(batch)
+            if stopping:
+                return
+    
+    def _encode_batch(self, batch: List[Tuple[List[str], Future]]):
+        """Run one encode call for a batch and hand every caller its rows"""
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            embeddings = np.asarray(self.model.encode(texts), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(texts)} texts: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        with self._lock:
+            self.batches += 1
+            self.texts += len(texts)
+        
+        offset = 0
+        for request_texts, future in batch:
+            future.set_result(embeddings[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+    
+    def close(self):
+        """Stop the worker once the queued requests are served"""
+        if not self._closed:
+            self._closed = True
+            self._requests.put((None, Future()))
+            self._worker.join()
+    
+    def stats(self) -> Dict[str, float]:
+        """Get batch counters"""
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'texts': self.texts,
+                'mean_batch_size': self.texts / self.batches if self.batches else 0.0
+            }
@@ -0,0 +1,269 @@
+import copy
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from . import config
+from .compiled_kb import check_artifact
+from .encoding_service import BatchEncodingService
+from .embedding_store import EmbeddingStore
+from .knowledge_base import EnhancedKnowledgeBase, KnowledgeBaseHolder
+from .model_loader import BackgroundModelLoader
+from .models import get_model_version, load_model
+from .query_embedding_cache import QueryEmbeddingCache
+from .response_cache import ResponseCache
+from .response_generator import ResponseGenerator
+from .watcher import FileWatcher
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+
+def build_query_encoder(model: 'SentenceTransformer', persist: Optional[bool] = None) -> QueryEmbeddingCache:
+    """Build the query encoder shared by every session: embedding cache, then micro-batching"""
+    encoder = model
+    if config.ENCODER_MICRO_BATCHING:
+        encoder = BatchEncodingService(model, config.ENCODER_MAX_BATCH_SIZE, config.ENCODER_MAX_WAIT_MS)
+    store = EmbeddingStore(
+        config.EMBEDDINGS_CACHE_DIR, 'queries', config.MODEL_NAME, get_model_version(model), config.EMBEDDINGS_DTYPE
+    )
+    return QueryEmbeddingCache(
+        encoder,
+        store,
+        max_size=config.QUERY_EMBEDDING_CACHE_SIZE,
+        persist=config.QUERY_EMBEDDING_CACHE_PERSIST if persist is None else persist
+    )
+
+
+def precompute_responses(knowledge_base: EnhancedKnowledgeBase):
+    """Resolve quick replies and frequent queries for the current knowledge base state"""
+    precompute_start = time.time()
+    knowledge_base.precomputed_responses = ResponseGenerator(
+        knowledge_base, category=config.SEARCH_CATEGORY, tags=config.SEARCH_TAGS
+    ).precompute(
+        config.QUICK_REPLIES + config.FREQUENT_QUERIES[:config.PRECOMPUTE_TOP_N]
+    )
+    logger.info(
+        f"Precomputed {len(knowledge_base.precomputed_responses)} responses "
+        f"in {(time.time() - precompute_start) * 1000:.0f} ms"
+    )
+
+
+def attach_model(knowledge_base: EnhancedKnowledgeBase, model: 'SentenceTransformer'):
+    """Enable semantic search on a loaded knowledge base and refresh its precomputed responses"""
+    knowledge_base.enable_semantic_search(model, build_query_encoder(model), publish=False)
+    # Answer the precomputed queries through a view with semantic search on, then publish the
+    # table and the flag together, so readers never pair semantic search with fuzzy-only answers
+    preview = copy.copy(knowledge_base)
+    preview.semantic_ready = True
+    precompute_responses(preview)
+    knowledge_base.precomputed_responses = preview.precomputed_responses
+    knowledge_base.semantic_ready = True
+    usage = knowledge_base.memory_usage()
+    logger.info(
+        f"Shared knowledge base footprint {usage['total'] / 1024 ** 2:.1f} MB "
+        f"(dataframe {usage['dataframe'] / 1024 ** 2:.1f} MB, "
+        f"embeddings {(usage['question_embeddings'] + usage['answer_embeddings']) / 1024 ** 2:.1f} MB)"
+    )
+
+
+def load_knowledge_base(knowledge_base: EnhancedKnowledgeBase, file_path: str) -> bool:
+    """Load from the compiled artifact when it was built from file_path as it is now, else parse the file"""
+    problem = check_artifact(file_path, config.KB_ARTIFACT_DIR)
+    if problem is None and knowledge_base.load_compiled(config.KB_ARTIFACT_DIR):
+        return True
+    if problem is not None and os.path.exists(config.KB_ARTIFACT_DIR):
+        logger.warning(f"Not using the compiled knowledge base: {problem}")
+    return knowledge_base.load_data(file_path)
+
+
+def build_knowledge_base(file_path: str, model_loader: Optional[BackgroundModelLoader] = None
+                         ) -> Optional[EnhancedKnowledgeBase]:
+    """Load a knowledge base for fuzzy search now and enable semantic search once the model loads"""
+    start_time = time.time()
+    knowledge_base = EnhancedKnowledgeBase()
+    if not load_knowledge_base(knowledge_base, file_path):
+        return None
+    precompute_responses(knowledge_base)
+    logger.info(f"Shared knowledge base built in {time.time() - start_time:.2f}s, fuzzy search available")
+    
+    if model_loader is not None:
+        model_loader.on_ready(lambda model: attach_model(knowledge_base, model))
+    return knowledge_base
+
+
+class ChatEngine:
+    """Everything one process shares between chat sessions
+
+    Building an engine loads the knowledge base and starts loading the model
+    on a background thread: fuzzy answers are available as soon as the
+    constructor returns and semantic search switches on once the model is
+    ready. Nothing here depends on a UI framework, so web apps, API servers,
+    workers and benchmarks all drive the same engine.
+
+    With ``watch`` on, edits to the knowledge base file are picked up while
+    serving: ``reload`` builds the new version on the watcher thread and
+    swaps it in through ``holder``, which response generators read once per
+    query.
+    """
+    
+    def __init__(self, knowledge_base_path: Optional[str] = None, load_model_in_background: bool = True,
+                 watch: Optional[bool] = None):
+        self.knowledge_base_path = knowledge_base_path or config.KNOWLEDGE_BASE_PATH
+        self.model_loader: Optional[BackgroundModelLoader] = None
+        if load_model_in_background:
+            self.model_loader = BackgroundModelLoader(load_model, name=config.MODEL_NAME)
+        self.response_cache = ResponseCache(max_size=config.RESPONSE_CACHE_SIZE, ttl=config.RESPONSE_CACHE_TTL)
+        self.holder = KnowledgeBaseHolder(build_knowledge_base(self.knowledge_base_path))
+        
+        # Attaching the model and reloading both replace state of the live knowledge base
+        self._reload_lock = threading.Lock()
+        self._reload_callbacks: List[Callable[[], None]] = []
+        self.reloads = 0
+        self.last_reload: Dict[str, Any] = {} if self.loaded else {'status': 'failed', 'at': time.time()}
+        if self.model_loader is not None:
+            self.model_loader.on_ready(self._attach_model)
+        
+        # Watch even when the first load failed, so fixing the file brings the engine up
+        self.watcher: Optional[FileWatcher] = None
+        if config.KB_HOT_RELOAD if watch is None else watch:
+            self.watcher = FileWatcher(self.knowledge_base_path, self.reload, config.KB_WATCH_INTERVAL)
+    
+    @property
+    def knowledge_base(self) -> Optional[EnhancedKnowledgeBase]:
+        """Get the live knowledge base"""
+        return self.holder.current
+    
+    @property
+    def loaded(self) -> bool:
+        """Check whether the knowledge base loaded"""
+        return self.knowledge_base is not None
+    
+    @property
+    def model_status(self) -> str:
+        """Get the model state: 'loading', 'ready', 'failed', or 'disabled' when no model was loaded"""
+        if self.model_loader is not None:
+            return self.model_loader.status
+        return 'ready' if self.loaded and self.knowledge_base.semantic_ready else 'disabled'
+    
+    def _attach_model(self, model: 'SentenceTransformer'):
+        """Enable semantic search on the live knowledge base; a later successful load attaches it instead"""
+        with self._reload_lock:
+            if self.loaded:
+                attach_model(self.knowledge_base, model)
+    
+    def load_model_now(self):
+        """Load the model on the calling thread and enable semantic search
+        
+        For engines built with ``load_model_in_background=False`` that must be
+        complete before they serve, such as the parent of a pre-fork server.
+        """
+        if self.loaded:
+            self._attach_model(load_model())
+    
+    def reload(self) -> bool:
+        """Rebuild the knowledge base from its file and swap it in; False keeps the current one
+        
+        The new version is built on the calling thread while queries keep
+        running against the current one. Its embeddings come from the same
+        content-addressed stores, so only questions and answers whose text is
+        new are encoded.
+        """
+        start_time = time.perf_counter()
+        with self._reload_lock:
+            current = self.knowledge_base
+            if current is not None:
+                knowledge_base = EnhancedKnowledgeBase(current.model, current.query_encoder)
+            else:
+                knowledge_base = EnhancedKnowledgeBase()
+            if not load_knowledge_base(knowledge_base, self.knowledge_base_path):
+                self.last_reload = {'status': 'failed', 'at': time.time()}
+                logger.error(
+                    f"Reload of {self.knowledge_base_path} failed, "
+                    + (f"keeping version {current.version}" if current is not None else "no knowledge base loaded")
+                )
+                return False
+            if current is not None and knowledge_base.version == current.version:
+                logger.info(f"Knowledge base content unchanged (version {current.version}), keeping it")
+                return True
+            if current is None and self.model_loader is not None and self.model_loader.status == 'ready':
+                # The model finished loading while there was no knowledge base to attach it to
+                attach_model(knowledge_base, self.model_loader.model)
+            else:
+                precompute_responses(knowledge_base)
+            changes = knowledge_base.diff(current)
+            self.holder.current = knowledge_base
+            self.reloads += 1
+            callbacks = list(self._reload_callbacks)
+        
+        self.last_reload = {
+            'status': 'ok',
+            'at': time.time(),
+            'seconds': time.perf_counter() - start_time,
+            'previous_version': current.version if current is not None else None,
+            'version': knowledge_base.version,
+            'encoded': knowledge_base.encoded_rows,
+            **changes
+        }
+        logger.info(
+            f"Knowledge base reloaded in {self.last_reload['seconds']:.2f}s: version {self.last_reload['previous_version']} -> "
+            f"{knowledge_base.version}, {changes['added']} added, {changes['changed']} changed, "
+            f"{changes['removed']} removed, {knowledge_base.encoded_rows} texts encoded"
+        )
+        for callback in callbacks:
+            callback()
+        return True
+    
+    def retry_load(self) -> bool:
+        """Retry a failed knowledge base load from a request, at most once per KB_LOAD_RETRY_INTERVAL
+        
+        Requests arriving while a reload is running, or soon after one failed,
+        return False straight away instead of queueing on the reload lock; the
+        file watcher keeps retrying in the background.
+        """
+        if self.loaded:
+            return True
+        if self._reload_lock.locked():
+            return False
+        if (self.last_reload.get('status') == 'failed'
+                and time.time() - self.last_reload['at'] < config.KB_LOAD_RETRY_INTERVAL):
+            return False
+        return self.reload() and self.loaded
+    
+    def on_reload(self, callback: Callable[[], None]):
+        """Call callback on the reloading thread after every successful reload"""
+        with self._reload_lock:
+            self._reload_callbacks.append(callback)
+    
+    def reload_stats(self) -> Dict[str, Any]:
+        """Get the live version and the outcome of the last reload"""
+        return {
+            'version': self.knowledge_base.version if self.loaded else None,
+            'reloads': self.reloads,
+            'watching': self.watcher is not None,
+            'last_reload': self.last_reload
+        }
+    
+    def after_fork(self):
+        """Give a forked worker process its own query encoder
+        
+        Threads do not survive ``fork``, so the parent's micro-batching encoder
+        cannot serve the child and is replaced. The knowledge base, its
+        memory-mapped embeddings and the indexes stay shared with the parent.
+        Workers keep their query embeddings in memory only, so they never race
+        to rewrite the same store. The parent's file watcher is not inherited
+        either: the parent reloads and forks fresh workers.
+        """
+        self.watcher = None
+        if self.loaded and self.knowledge_base.model is not None:
+            self.knowledge_base.query_encoder = build_query_encoder(self.knowledge_base.model, persist=False)
+    
+    def response_generator(self) -> ResponseGenerator:
+        """Create a response generator over the live knowledge base and the shared response cache"""
+        return ResponseGenerator(
+            self.holder, self.response_cache, category=config.SEARCH_CATEGORY, tags=config.SEARCH_TAGS
+        )
@@ -0,0 +1,112 @@
+import heapq
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+from fuzzywuzzy import fuzz
+from fuzzywuzzy import utils
+
+
+def sort_tokens(text: str) -> str:
+    """Normalize text the way process.extract prepares it for token_sort_ratio"""
+    return ' '.join(sorted(utils.full_process(text, force_ascii=True).split()))
+
+
+class FuzzyIndex:
+    """Precomputed token_sort_ratio matcher returning the same top-k as process.extract
+
+    Choices are normalized and token-sorted once. Each choice also keeps a
+    character histogram: since Levenshtein ``ratio`` is ``2 * LCS / (len_a + len_b)``
+    and the LCS can never exceed the shared character counts, the histograms give
+    a vectorized upper bound on every row's score. Rows are scored exactly in
+    descending bound order and the scan stops as soon as no remaining row can
+    reach the current top-k, so usually only a handful of rows pay for the full
+    Levenshtein comparison.
+    """
+    
+    def __init__(self, choices: List[str]):
+        self.choices = [sort_tokens(choice) for choice in choices]
+        self.lengths = np.array([len(choice) for choice in self.choices], dtype=np.int32)
+        
+        alphabet = sorted({char for choice in self.choices for char in choice})
+        self.char_ids: Dict[str, int] = {char: i for i, char in enumerate(alphabet)}
+        self.histograms = np.zeros((len(self.choices), len(alphabet)), dtype=np.uint16)
+        for row, choice in enumerate(self.choices):
+            for char in choice:
+                self.histograms[row, self.char_ids[char]] += 1
+    
+    def __len__(self) -> int:
+        return len(self.choices)
+    
+    def subset(self, rows: np.ndarray) -> 'FuzzyIndex':
+        """Get an index over some rows only, numbered by their position in rows"""
+        index = FuzzyIndex.__new__(FuzzyIndex)
+        index.choices = [self.choices[row] for row in rows]
+        index.lengths = self.lengths[rows]
+        index.histograms = self.histograms[rows]
+        index.char_ids = self.char_ids
+        return index
+    
+    # Never produced by full_process, which keeps only letters, digits and spaces
+    SEPARATOR = '\x1f'
+    
+    def save(self, path: str):
+        """Persist the normalized choices and histograms so loading skips preprocessing"""
+        alphabet = sorted(self.char_ids, key=self.char_ids.get)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            choices=np.array(self.SEPARATOR.join(self.choices)),
+            alphabet=np.array(''.join(alphabet)),
+            lengths=self.lengths,
+            histograms=self.histograms
+        )
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'FuzzyIndex':
+        """Load an index written by save"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls.__new__(cls)
+            index.lengths = data['lengths']
+            index.histograms = data['histograms']
+            index.choices = str(data['choices']).split(cls.SEPARATOR) if len(index.lengths) else []
+            index.char_ids = {char: i for i, char in enumerate(str(data['alphabet']))}
+        return index
+    
+    def _upper_bounds(self, query: str) -> np.ndarray:
+        """Get the highest score each row could reach against the query"""
+        query_histogram = np.zeros(self.histograms.shape[1], dtype=np.uint16)
+        for char in query:
+            char_id = self.char_ids.get(char)
+            if char_id is not None:
+                query_histogram[char_id] += 1
+        
+        overlap = np.minimum(self.histograms, query_histogram).sum(axis=1)
+        total = self.lengths + len(query)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bounds = np.where(total > 0, 200.0 * overlap / total, 100.0)
+        return np.rint(bounds)
+    
+    def search(self, query: str, top_k: int) -> List[Tuple[int, int]]:
+        """Get (row, score) pairs of the top_k choices, best first, ties in row order"""
+        if top_k <= 0 or not self.choices:
+            return []
+        
+        query = sort_tokens(query)
+        bounds = self._upper_bounds(query)
+        order = np.argsort(-bounds, kind='stable')
+        
+        # Min-heap of (score, -row) holding the best top_k rows seen so far
+        best: List[Tuple[int, int]] = []
+        for row in order:
+            if len(best) == top_k and bounds[row] < best[0][0]:
+                break
+            score = fuzz.ratio(query, self.choices[row])
+            entry = (score, -int(row))
+            if len(best) < top_k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        
+        return [(-neg_row, score) for score, neg_row in sorted(best, reverse=True)]
@@ -0,0 +1,758 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import config
+from .bm25_index import BM25Index
+from .compiled_kb import ARTIFACT_FORMAT_VERSION, read_artifact_header
+from .embedding_store import EmbeddingStore
+from .models import get_model_version
+from .vector_search import MultiFieldIndex, VectorIndex, build_index, normalize_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sentence_transformers import SentenceTransformer
+    
+    from .fuzzy_index import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+
+def get_pandas():
+    """Import pandas on first use, so importing the engine stays cheap"""
+    import pandas
+    return pandas
+
+
+def embedding_fields() -> List[str]:
+    """Get the columns semantic search encodes under the current configuration"""
+    return ['questions', 'answers'] if config.MULTI_FIELD_SEARCH else ['questions']
+
+
+def filter_key(value: str) -> str:
+    """Normalize a category or tag for matching: case and spacing do not matter"""
+    return ' '.join(str(value).lower().split())
+
+
+def filter_scope(category: Optional[str] = None,
+                 tags: Optional[Union[str, Sequence[str]]] = None) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """Get the normalized (category, tags) a filtered search is keyed by"""
+    if isinstance(tags, str):
+        tags = [tags]
+    return (
+        filter_key(category) if category else None,
+        tuple(sorted({filter_key(tag) for tag in tags or []} - {''}))
+    )
+
+
+def group_rows(codes: np.ndarray, n_codes: int) -> List[np.ndarray]:
+    """Get the ascending row ids holding each code"""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(n_codes + 1))
+    return [order[bounds[code]:bounds[code + 1]].astype(np.int32) for code in range(n_codes)]
+
+
+class SearchSlice(NamedTuple):
+    """Rows matching a filter, with fuzzy and vector indexes over just those rows
+    
+    Both indexes number rows by their position in ``rows``, which is sorted,
+    so ties still break in row order.
+    """
+    rows: np.ndarray
+    fuzzy_index: 'FuzzyIndex'
+    index: Optional[VectorIndex]
+    bm25_index: BM25Index
+
+
+class KnowledgeBaseHolder:
+    """Reference to the live knowledge base, replaced in one assignment on reload
+    
+    Readers take ``current`` once per query and use that instance throughout,
+    so a reload never mixes two versions within a query and in-flight queries
+    finish on the instance they started with.
+    """
+    
+    def __init__(self, knowledge_base: Optional['EnhancedKnowledgeBase'] = None):
+        self.current = knowledge_base
+
+
+class EnhancedKnowledgeBase:
+    """Enhanced knowledge base with caching and better search"""
+    
+    def __init__(self, model: Optional['SentenceTransformer'] = None, query_encoder=None):
+        self.model = model
+        # Anything with a SentenceTransformer-style encode(); defaults to the model itself
+        self.query_encoder = query_encoder if query_encoder is not None else model
+        # Until the model is attached only fuzzy search is available
+        self.semantic_ready = False
+        self.df = None
+        self.embeddings = None
+        self.index = None
+        self.fuzzy_index = None
+        self.bm25_index: Optional[BM25Index] = None
+        self.question_embeddings = None
+        self.answer_embeddings = None
+        self.embeddings_fingerprint = ''
+        self.encoded_rows = 0
+        self.version = ''
+        self.precomputed_responses: Dict[str, Dict] = {}
+        self.categories = set()
+        self.tags = set()
+        # Set when loaded from a compiled artifact, whose embeddings are reused if the model matches
+        self.artifact_dir: Optional[str] = None
+        self.artifact_header: Dict = {}
+        
+        # Hybrid search counters, updated by concurrent sessions
+        self._stats_lock = threading.Lock()
+        self._fast_path_searches = 0
+        self._full_searches = 0
+        self._fast_path_seconds = 0.0
+        self._full_search_seconds = 0.0
+        
+        # Row-id posting lists by normalized category and individual tag, filled by _build_postings,
+        # and the slices built from them for filtered searches
+        self.category_rows: Dict[str, np.ndarray] = {}
+        self.tag_rows: Dict[str, np.ndarray] = {}
+        self._slices: Dict[Tuple[Optional[str], Tuple[str, ...]], SearchSlice] = {}
+        self._slices_lock = threading.Lock()
+        
+        # Column arrays addressed by dense row id, filled by _compile_columns
+        self.questions: List[str] = []
+        self.questions_clean: List[str] = []
+        self.answers_clean: List[str] = []
+        self.answer_codes = np.empty(0, dtype=np.int32)
+        self.answer_values: List[str] = []
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self.category_values: List[str] = []
+        self.tag_codes = np.empty(0, dtype=np.int32)
+        self.tag_values: List[str] = []
+    
+    def load_data(self, file_path: str) -> bool:
+        """Load and preprocess knowledge base data"""
+        try:
+            if not os.path.exists(file_path):
+                logger.error(f"Knowledge base file not found: {file_path}")
+                return False
+            
+            self.df = get_pandas().read_excel(file_path)
+            required_columns = {'questions', 'answers', 'categories', 'tags'}
+            
+            if not required_columns.issubset(self.df.columns):
+                missing_cols = required_columns - set(self.df.columns)
+                logger.error(f"Missing required columns: {missing_cols}")
+                return False
+            
+            # Clean and preprocess data; row ids are positions, so the index must stay dense
+            self.df = self.df.dropna(subset=['questions', 'answers']).reset_index(drop=True)
+            self.df['questions_clean'] = self.df['questions'].astype(str).str.lower().str.strip()
+            self.df['answers_clean'] = self.df['answers'].astype(str).str.strip()
+            
+            # Extract categories and tags
+            self.categories = set(self.df['categories'].dropna().unique())
+            self.tags = set(self.df['tags'].dropna().unique())
+            self._compile_columns()
+            self.version = self._compute_version()
+            
+            # Build the search indexes up front so the loaded instance is never mutated
+            # by queries and can be shared read-only between sessions
+            from .fuzzy_index import FuzzyIndex
+            self.fuzzy_index = FuzzyIndex(self.questions_clean)
+            self.bm25_index = self._build_bm25_index()
+            self._build_postings()
+            if self.model is not None:
+                self._build_semantic_index()
+            self._freeze()
+            
+            logger.info(f"Knowledge base loaded successfully with {len(self.df)} entries")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error loading knowledge base: {e}")
+            return False
+    
+    def load_compiled(self, directory: str) -> bool:
+        """Load a knowledge base compiled by ``python -m hcil_chatbot.artifact build``
+        
+        Only JSON and NumPy files are read, so neither pandas nor openpyxl is
+        imported. ``df`` stays None; the columns, fuzzy index and version come
+        straight from the artifact.
+        """
+        try:
+            header = read_artifact_header(directory)
+            if header is None or header.get('format_version') != ARTIFACT_FORMAT_VERSION:
+                logger.error(f"No compatible compiled knowledge base in {directory}")
+                return False
+            
+            with open(os.path.join(directory, 'columns.json'), 'r', encoding='utf-8') as f:
+                columns = json.load(f)
+            with np.load(os.path.join(directory, 'codes.npz'), allow_pickle=False) as codes:
+                self.answer_codes = codes['answers']
+                self.category_codes = codes['categories']
+                self.tag_codes = codes['tags']
+            self.questions = columns['questions']
+            self.questions_clean = columns['questions_clean']
+            self.answers_clean = columns['answers_clean']
+            self.answer_values = columns['answer_values']
+            self.category_values = columns['category_values']
+            self.tag_values = columns['tag_values']
+            self.categories = set(columns['categories'])
+            self.tags = set(columns['tags'])
+            self.version = header['kb_version']
+            self.artifact_dir = directory
+            self.artifact_header = header
+            
+            from .fuzzy_index import FuzzyIndex
+            self.fuzzy_index = FuzzyIndex.load(os.path.join(directory, 'fuzzy.npz'))
+            bm25_path = os.path.join(directory, 'bm25.npz')
+            # Artifacts compiled before BM25 search existed lack the index
+            self.bm25_index = BM25Index.load(bm25_path) if os.path.exists(bm25_path) else self._build_bm25_index()
+            self._build_postings()
+            if self.model is not None:
+                self._build_semantic_index()
+            self._freeze()
+            
+            logger.info(f"Compiled knowledge base loaded with {len(self.questions)} entries (version {self.version})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error loading compiled knowledge base: {e}")
+            return False
+    
+    def save_compiled(self, directory: str, source_path: str, source_digest: str):
+        """Write the loaded knowledge base into an empty directory as a compiled artifact
+        
+        Text columns go to JSON, row codes and the fuzzy index to ``.npz``
+        files, and embeddings (when semantic search is enabled) to
+        memory-mappable stores with the IVF lists next to them. The header is
+        written last, so a directory with a header is complete.
+        """
+        os.makedirs(directory, exist_ok=True)
+        columns = {
+            'questions': self.questions,
+            'questions_clean': self.questions_clean,
+            'answers_clean': self.answers_clean,
+            'answer_values': self.answer_values,
+            'category_values': self.category_values,
+            'tag_values': self.tag_values,
+            'categories': sorted(str(category) for category in self.categories),
+            'tags': sorted(str(tag) for tag in self.tags)
+        }
+        with open(os.path.join(directory, 'columns.json'), 'w', encoding='utf-8') as f:
+            json.dump(columns, f, ensure_ascii=False)
+        np.savez(
+            os.path.join(directory, 'codes.npz'),
+            answers=self.answer_codes,
+            categories=self.category_codes,
+            tags=self.tag_codes
+        )
+        self.fuzzy_index.save(os.path.join(directory, 'fuzzy.npz'))
+        self.bm25_index.save(os.path.join(directory, 'bm25.npz'))
+        
+        header = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'kb_version': self.version,
+            'rows': len(self.questions),
+            'source': os.path.basename(source_path),
+            'source_sha256': source_digest,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'model_name': None,
+            'model_version': None,
+            'embeddings_dtype': None,
+            'embeddings_fingerprint': None,
+            'index_backend': None,
+            'embedding_fields': []
+        }
+        if self.semantic_ready:
+            model_version = get_model_version(self.model)
+            fields = [('questions', self.questions_clean, self.question_embeddings)]
+            if self.answer_embeddings is not None:
+                fields.append(('answers', self.answers_clean, self.answer_embeddings))
+            for name, texts, matrix in fields:
+                store = EmbeddingStore(directory, name, config.MODEL_NAME, model_version, config.EMBEDDINGS_DTYPE)
+                store.write([store.key(text) for text in texts], matrix)
+            if config.INDEX_BACKEND != 'exact':
+                self.index.save(os.path.join(directory, f'questions.{config.INDEX_BACKEND}.npz'),
+                                fingerprint=self.embeddings_fingerprint)
+            header.update({
+                'model_name': config.MODEL_NAME,
+                'model_version': model_version,
+                'embeddings_dtype': config.EMBEDDINGS_DTYPE,
+                'embeddings_fingerprint': self.embeddings_fingerprint,
+                'index_backend': config.INDEX_BACKEND,
+                'embedding_fields': [name for name, _, _ in fields]
+            })
+        
+        tmp_header_path = os.path.join(directory, 'header.json.tmp')
+        with open(tmp_header_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_header_path, os.path.join(directory, 'header.json'))
+    
+    def enable_semantic_search(self, model: 'SentenceTransformer', query_encoder=None, publish: bool = True):
+        """Attach a model that finished loading after the data, enabling semantic search
+        
+        With ``publish`` off the index is built but searches keep using fuzzy
+        matching until the caller sets ``semantic_ready``.
+        """
+        self.model = model
+        self.query_encoder = query_encoder if query_encoder is not None else model
+        start_time = time.time()
+        self._build_semantic_index(publish)
+        self._freeze()
+        logger.info(f"Semantic search enabled in {time.time() - start_time:.2f}s")
+    
+    def _build_semantic_index(self, publish: bool = True):
+        """Generate embeddings and build the vector index; searches use it once published"""
+        self._generate_embeddings()
+        # A compiled artifact carries prebuilt lists for its own embeddings
+        index_dir = self.artifact_dir if self._artifact_embeddings_usable() else config.EMBEDDINGS_CACHE_DIR
+        if config.MULTI_FIELD_SEARCH:
+            if config.INDEX_BACKEND != 'exact':
+                logger.warning(f"Multi-field search is exact; ignoring index backend {config.INDEX_BACKEND}")
+            self.index = MultiFieldIndex(
+                [self.question_embeddings, self.answer_embeddings],
+                [config.FIELD_WEIGHTS.get('questions', 0.0), config.FIELD_WEIGHTS.get('answers', 0.0)]
+            )
+        else:
+            self.index = build_index(
+                self.question_embeddings,
+                config.INDEX_BACKEND,
+                cache_path=os.path.join(index_dir, f'questions.{config.INDEX_BACKEND}.npz'),
+                fingerprint=self.embeddings_fingerprint,
+                n_lists=config.IVF_N_LISTS,
+                n_probe=config.IVF_N_PROBE
+            )
+        self._prebuild_category_slices()
+        # Flip the flag last: concurrent searches only use the index once it is complete
+        if publish:
+            self.semantic_ready = True
+    
+    def _compile_columns(self):
+        """Compile the columns used to build results into arrays indexed by row id"""
+        def encode(column: str) -> Tuple[np.ndarray, List[str]]:
+            values = self.df[column].where(self.df[column].notna(), '').astype(str)
+            codes, uniques = get_pandas().factorize(values)
+            return codes.astype(np.int32), [str(value) for value in uniques]
+        
+        self.questions = self.df['questions'].astype(str).tolist()
+        self.questions_clean = self.df['questions_clean'].tolist()
+        self.answers_clean = self.df['answers_clean'].tolist()
+        self.answer_codes, self.answer_values = encode('answers')
+        self.category_codes, self.category_values = encode('categories')
+        self.tag_codes, self.tag_values = encode('tags')
+    
+    def _build_bm25_index(self) -> BM25Index:
+        """Build the BM25 index over the cleaned questions, answers and tags"""
+        weights = config.BM25_FIELD_WEIGHTS
+        return BM25Index(
+            [self.questions_clean, self.answers_clean, [self.tag_values[code] for code in self.tag_codes]],
+            [weights.get('questions', 0.0), weights.get('answers', 0.0), weights.get('tags', 0.0)],
+            k1=config.BM25_K1,
+            b=config.BM25_B
+        )
+    
+    def _build_postings(self):
+        """Build the row-id posting lists of every category and every individual tag"""
+        category_rows: Dict[str, List[np.ndarray]] = {}
+        for value, rows in zip(self.category_values, group_rows(self.category_codes, len(self.category_values))):
+            if value.strip():
+                category_rows.setdefault(filter_key(value), []).append(rows)
+        
+        # The tags column holds comma-separated lists; every tag in it gets its own posting list
+        tag_rows: Dict[str, List[np.ndarray]] = {}
+        for value, rows in zip(self.tag_values, group_rows(self.tag_codes, len(self.tag_values))):
+            for tag in {filter_key(tag) for tag in value.split(',')} - {''}:
+                tag_rows.setdefault(tag, []).append(rows)
+        
+        def merge(lists: Dict[str, List[np.ndarray]]) -> Dict[str, np.ndarray]:
+            return {key: np.unique(np.concatenate(parts)).astype(np.int32) for key, parts in lists.items()}
+        
+        self.category_rows = merge(category_rows)
+        self.tag_rows = merge(tag_rows)
+        self._prebuild_category_slices()
+    
+    def _prebuild_category_slices(self):
+        """Build the slice of every category up front; categories partition the rows, so this costs one copy"""
+        self._slices = {(key, ()): self._build_slice(key, ()) for key in self.category_rows}
+    
+    def _build_slice(self, category: Optional[str], tags: Tuple[str, ...]) -> SearchSlice:
+        """Build the slice of rows in a category (if given) that carry any of the tags (if given)"""
+        empty = np.empty(0, dtype=np.int32)
+        rows = self.category_rows.get(category, empty) if category is not None else None
+        if tags:
+            tagged = np.unique(np.concatenate([self.tag_rows.get(tag, empty) for tag in tags]))
+            rows = tagged if rows is None else np.intersect1d(rows, tagged, assume_unique=True)
+        rows = rows.astype(np.int32)
+        index = self.index.subset(rows) if self.index is not None else None
+        return SearchSlice(rows, self.fuzzy_index.subset(rows), index, self.bm25_index.subset(rows))
+    
+    def get_slice(self, category: Optional[str] = None,
+                  tags: Optional[Union[str, Sequence[str]]] = None) -> Optional[SearchSlice]:
+        """Get the rows and sub-indexes for a filter, or None when nothing is filtered"""
+        key = filter_scope(category, tags)
+        if key == (None, ()):
+            return None
+        
+        search_slice = self._slices.get(key)
+        # Slices built while the model was loading have no vector index yet
+        if search_slice is None or (search_slice.index is None and self.index is not None):
+            search_slice = self._build_slice(*key)
+            with self._slices_lock:
+                if len(self._slices) < config.FILTER_SLICE_CACHE_SIZE or key in self._slices:
+                    self._slices[key] = search_slice
+        return search_slice
+    
+    def _compute_version(self) -> str:
+        """Get a short digest of the loaded content, used to key caches"""
+        digest = hashlib.sha256()
+        # Read from the compiled columns, where blank categories and tags are already ''
+        columns = (
+            self.questions,
+            (self.answer_values[code] for code in self.answer_codes),
+            (self.category_values[code] for code in self.category_codes),
+            (self.tag_values[code] for code in self.tag_codes)
+        )
+        for values in columns:
+            digest.update('\x1f'.join(values).encode('utf-8'))
+            digest.update(b'\x1e')
+        return digest.hexdigest()[:12]
+    
+    def _make_result(self, idx: int, score: float, method: str) -> Dict:
+        """Build a search result for a row id"""
+        return {
+            'index': idx,
+            'question': self.questions[idx],
+            'answer': self.answer_values[self.answer_codes[idx]],
+            'category': self.category_values[self.category_codes[idx]],
+            'tags': self.tag_values[self.tag_codes[idx]],
+            'score': score,
+            'method': method
+        }
+    
+    def _freeze(self):
+        """Mark the loaded arrays read-only so shared instances cannot be modified"""
+        for array in (self.question_embeddings, self.answer_embeddings, getattr(self.index, 'embeddings', None),
+                      self.answer_codes, self.category_codes, self.tag_codes,
+                      getattr(self.bm25_index, 'weights', None)):
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+    
+    def diff(self, previous: Optional['EnhancedKnowledgeBase']) -> Dict[str, int]:
+        """Count rows added, removed and changed since a previous version
+        
+        Rows are compared by content, so reordering the sheet changes nothing;
+        a removed and an added row with the same question count as one change.
+        """
+        def rows(kb: Optional['EnhancedKnowledgeBase']) -> Counter:
+            if kb is None:
+                return Counter()
+            return Counter(zip(
+                kb.questions,
+                (kb.answer_values[code] for code in kb.answer_codes),
+                (kb.category_values[code] for code in kb.category_codes),
+                (kb.tag_values[code] for code in kb.tag_codes)
+            ))
+        
+        current, before = rows(self), rows(previous)
+        added, removed = current - before, before - current
+        added_questions = Counter(row[0] for row in added.elements())
+        removed_questions = Counter(row[0] for row in removed.elements())
+        changed = sum((added_questions & removed_questions).values())
+        return {
+            'added': sum(added.values()) - changed,
+            'removed': sum(removed.values()) - changed,
+            'changed': changed,
+            'unchanged': sum((current & before).values())
+        }
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """Get the approximate memory footprint of the loaded data in bytes"""
+        usage = {
+            'dataframe': int(self.df.memory_usage(deep=True).sum()) if self.df is not None else 0,
+            'question_embeddings': int(getattr(self.question_embeddings, 'nbytes', 0)),
+            'answer_embeddings': int(getattr(self.answer_embeddings, 'nbytes', 0))
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+    
+    def _artifact_embeddings_usable(self) -> bool:
+        """Check whether the compiled artifact holds embeddings for the current model and settings"""
+        header = self.artifact_header
+        return (
+            self.artifact_dir is not None
+            and self.model is not None
+            and header.get('model_name') == config.MODEL_NAME
+            and header.get('model_version') == get_model_version(self.model)
+            and header.get('embeddings_dtype') == config.EMBEDDINGS_DTYPE
+            and header.get('index_backend') == config.INDEX_BACKEND
+            # Artifacts from before fields were recorded hold both
+            and set(embedding_fields()) <= set(header.get('embedding_fields', ['questions', 'answers']))
+        )
+    
+    def _load_artifact_embeddings(self) -> bool:
+        """Map the embeddings of the compiled artifact, or return False to encode them instead"""
+        if not self._artifact_embeddings_usable():
+            return False
+        model_version = self.artifact_header['model_version']
+        stores = [
+            EmbeddingStore(self.artifact_dir, name, config.MODEL_NAME, model_version, config.EMBEDDINGS_DTYPE)
+            for name in embedding_fields()
+        ]
+        if any(len(store.keys) != len(self.questions) for store in stores) or \
+                stores[0].fingerprint() != self.artifact_header['embeddings_fingerprint']:
+            logger.warning(f"Embeddings in {self.artifact_dir} do not match its rows, encoding instead")
+            return False
+        self.question_embeddings = stores[0].matrix
+        self.answer_embeddings = stores[1].matrix if len(stores) > 1 else None
+        self.embeddings_fingerprint = self.artifact_header['embeddings_fingerprint']
+        self.encoded_rows = 0
+        logger.info(f"Embeddings mapped from compiled knowledge base {self.artifact_dir}")
+        return True
+    
+    def _generate_embeddings(self):
+        """Generate embeddings for questions, and for answers when multi-field search is on"""
+        if self._load_artifact_embeddings():
+            return
+        try:
+            model_version = get_model_version(self.model)
+            stores = {
+                name: EmbeddingStore(config.EMBEDDINGS_CACHE_DIR, name, config.MODEL_NAME, model_version, config.EMBEDDINGS_DTYPE)
+                for name in embedding_fields()
+            }
+            
+            # Stores map their files read-only and only encode rows they have not seen
+            self.question_embeddings = stores['questions'].encode(self.questions_clean, self.model.encode)
+            self.answer_embeddings = (
+                stores['answers'].encode(self.answers_clean, self.model.encode) if 'answers' in stores else None
+            )
+            self.embeddings_fingerprint = stores['questions'].fingerprint()
+            
+            self.encoded_rows = 0
+            for name, store in stores.items():
+                stats = store.stats()
+                self.encoded_rows += stats['misses']
+                logger.info(f"Embedding cache ({name}): {stats['hits']} hits, {stats['misses']} misses")
+            
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}")
+            raise
+    
+    def search(self, query: str, method: str = 'hybrid', top_k: int = 3, category: Optional[str] = None,
+               tags: Optional[Union[str, Sequence[str]]] = None) -> List[Dict]:
+        """Enhanced search with multiple methods - FIXED VERSION
+        
+        ``method`` is 'hybrid', 'semantic', 'fuzzy', 'bm25', or 'rerank' (BM25
+        candidates re-scored with embeddings). ``category`` restricts results
+        to one category and ``tags`` to rows carrying any of the given tags;
+        filtered searches only scan the matching rows.
+        """
+        if self.fuzzy_index is None:
+            return []
+        
+        query_clean = query.lower().strip()
+        if not query_clean:
+            return []
+        
+        search_slice = self.get_slice(category, tags)
+        if search_slice is not None and not len(search_slice.rows):
+            return []
+        
+        # BM25 needs no model; it is also the first stage of re-ranking, so it answers those while loading
+        if method == 'bm25' or (method == 'rerank' and not self.semantic_ready):
+            return self._bm25_search(query_clean, top_k, search_slice)
+        
+        # Serve fuzzy matches while the model is still loading
+        if not self.semantic_ready:
+            return self._fuzzy_search(query_clean, top_k, search_slice)
+        
+        if method == 'rerank':
+            return self._rerank_search(query_clean, top_k, search_slice)
+        if method == 'fuzzy':
+            return self._fuzzy_search(query_clean, top_k, search_slice)
+        if method == 'hybrid':
+            return self._hybrid_search(query_clean, top_k, search_slice)
+        if method == 'semantic':
+            query_embedding = self._encode_query(query_clean)
+            if query_embedding is None:
+                return []
+            return self._semantic_search(query_embedding, top_k, search_slice)
+        return []
+    
+    def _encode_query(self, query_clean: str) -> Optional[np.ndarray]:
+        """Encode a query, or None if the encoder fails"""
+        try:
+            return self.query_encoder.encode([query_clean])
+        except Exception as e:
+            logger.error(f"Error encoding query: {e}")
+            return None
+    
+    def _hybrid_search(self, query_clean: str, top_k: int, search_slice: Optional[SearchSlice] = None) -> List[Dict]:
+        """Fuzzy search first; run the model only when the fuzzy match is not near-exact"""
+        start_time = time.perf_counter()
+        depth = max(top_k, config.FUSION_DEPTH)
+        fuzzy_results = self._fuzzy_search(query_clean, depth, search_slice)
+        if fuzzy_results and fuzzy_results[0]['score'] * 100 >= config.FUZZY_EARLY_EXIT_SCORE:
+            self._record_search(True, time.perf_counter() - start_time)
+            return fuzzy_results[:top_k]
+        
+        query_embedding = self._encode_query(query_clean)
+        if query_embedding is None:
+            return []
+        semantic_results = self._semantic_search(query_embedding, depth, search_slice)
+        bm25_results = self._bm25_search(query_clean, depth, search_slice) if config.HYBRID_BM25 else []
+        results = self._fuse_results(semantic_results, fuzzy_results, top_k, bm25_results)
+        self._record_search(False, time.perf_counter() - start_time)
+        return results
+    
+    def _record_search(self, fast_path: bool, seconds: float):
+        """Count a hybrid search and its latency"""
+        with self._stats_lock:
+            if fast_path:
+                self._fast_path_searches += 1
+                self._fast_path_seconds += seconds
+            else:
+                self._full_searches += 1
+                self._full_search_seconds += seconds
+    
+    def search_stats(self) -> Dict[str, float]:
+        """Get how often hybrid search took the fuzzy fast path and the latency that saved"""
+        with self._stats_lock:
+            searches = self._fast_path_searches + self._full_searches
+            fast_ms = self._fast_path_seconds * 1000 / self._fast_path_searches if self._fast_path_searches else 0.0
+            full_ms = self._full_search_seconds * 1000 / self._full_searches if self._full_searches else 0.0
+            return {
+                'searches': searches,
+                'fast_path': self._fast_path_searches,
+                'fast_path_rate': self._fast_path_searches / searches if searches else 0.0,
+                'mean_fast_path_ms': fast_ms,
+                'mean_full_search_ms': full_ms,
+                # Estimated from the mean full search, since fast-path queries were never encoded
+                'saved_ms': max(full_ms - fast_ms, 0.0) * self._fast_path_searches if self._full_searches else 0.0
+            }
+    
+    def _semantic_search(self, query_embedding, top_k: int, search_slice: Optional[SearchSlice] = None) -> List[Dict]:
+        """Perform semantic search using embeddings"""
+        try:
+            if search_slice is None:
+                indices, scores = self.index.search(query_embedding, top_k)
+                return [
+                    self._make_result(int(idx), float(score), 'semantic')
+                    for idx, score in zip(indices, scores)
+                    if 0 <= idx < len(self.questions)
+                ]
+            
+            indices, scores = search_slice.index.search(query_embedding, top_k)
+            return [
+                self._make_result(int(search_slice.rows[idx]), float(score), 'semantic')
+                for idx, score in zip(indices, scores)
+                if 0 <= idx < len(search_slice.rows)
+            ]
+        except Exception as e:
+            logger.error(f"Error in semantic search: {e}")
+            return []
+    
+    def _fuzzy_search(self, query_clean: str, top_k: int, search_slice: Optional[SearchSlice] = None) -> List[Dict]:
+        """Perform fuzzy string matching"""
+        try:
+            if search_slice is None:
+                return [
+                    self._make_result(idx, float(score / 100), 'fuzzy')
+                    for idx, score in self.fuzzy_index.search(query_clean, top_k)
+                ]
+            return [
+                self._make_result(int(search_slice.rows[idx]), float(score / 100), 'fuzzy')
+                for idx, score in search_slice.fuzzy_index.search(query_clean, top_k)
+            ]
+        except Exception as e:
+            logger.error(f"Error in fuzzy search: {e}")
+            return []
+    
+    def _bm25_search(self, query_clean: str, top_k: int, search_slice: Optional[SearchSlice] = None) -> List[Dict]:
+        """Perform BM25 keyword search"""
+        try:
+            if search_slice is None:
+                return [
+                    self._make_result(idx, score, 'bm25')
+                    for idx, score in self.bm25_index.search(query_clean, top_k)
+                ]
+            return [
+                self._make_result(int(search_slice.rows[idx]), score, 'bm25')
+                for idx, score in search_slice.bm25_index.search(query_clean, top_k)
+            ]
+        except Exception as e:
+            logger.error(f"Error in BM25 search: {e}")
+            return []
+    
+    def _rerank_search(self, query_clean: str, top_k: int, search_slice: Optional[SearchSlice] = None) -> List[Dict]:
+        """Re-score the top BM25 candidates with embeddings instead of scanning every row"""
+        candidates = self._bm25_search(query_clean, max(top_k, config.RERANK_CANDIDATES), search_slice)
+        query_embedding = self._encode_query(query_clean)
+        if query_embedding is None:
+            return candidates[:top_k]
+        # Queries sharing no term with any row (typos, synonyms) still get a semantic answer
+        if not candidates:
+            return self._semantic_search(query_embedding, top_k, search_slice)
+        
+        try:
+            rows = np.array([result['index'] for result in candidates])
+            query_vector = normalize_rows(query_embedding)[0]
+            scores = np.asarray(self.index.embeddings[rows]) @ query_vector
+            order = np.argsort(-scores, kind='stable')[:top_k]
+            return [self._make_result(int(rows[i]), float(scores[i]), 'rerank') for i in order]
+        except Exception as e:
+            logger.error(f"Error re-ranking BM25 candidates: {e}")
+            return candidates[:top_k]
+    
+    def _fuse_results(self, semantic_results: List[Dict], fuzzy_results: List[Dict], top_k: int,
+                      bm25_results: Optional[List[Dict]] = None) -> List[Dict]:
+        """Fuse ranked results with reciprocal rank fusion
+        
+        Cosine similarities, token_sort_ratio and BM25 scores are not on a
+        common scale, so rows are ranked by the sum of ``1 / (config.RRF_K + rank)``
+        over the methods that returned them. Each result keeps its best raw
+        score as the reported confidence; rows found by several methods become
+        'hybrid'.
+        """
+        try:
+            fused: Dict[int, Dict] = {}
+            for results in (semantic_results, fuzzy_results, bm25_results or []):
+                for rank, result in enumerate(results, start=1):
+                    entry = fused.get(result['index'])
+                    if entry is None:
+                        entry = fused[result['index']] = dict(result, fused_score=0.0)
+                    else:
+                        entry['score'] = max(entry['score'], result['score'])
+                        entry['method'] = 'hybrid'
+                    entry['fused_score'] += 1 / (config.RRF_K + rank)
+            
+            return sorted(fused.values(), key=lambda x: (x['fused_score'], x['score']), reverse=True)[:top_k]
+        except Exception as e:
+            logger.error(f"Error fusing results: {e}")
+            return semantic_results[:top_k] if semantic_results else fuzzy_results[:top_k]
+    
+    def get_categories(self) -> List[str]:
+        """Get all available categories"""
+        return list(self.categories)
+    
+    def get_tags(self) -> List[str]:
+        """Get all available tags"""
+        return list(self.tags)
+    
+    def filter_by_category(self, category: str) -> 'pd.DataFrame':
+        """Filter knowledge base by category"""
+        df = self.df
+        if df is None:
+            # Loaded from a compiled artifact; rebuild the visible columns
+            df = get_pandas().DataFrame({
+                'questions': self.questions,
+                'answers': [self.answer_values[code] for code in self.answer_codes],
+                'categories': [self.category_values[code] for code in self.category_codes],
+                'tags': [self.tag_values[code] for code in self.tag_codes]
+            })
+        return df[df['categories'] == category]
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundModelLoader:
+    """Load a model on a background thread and report its state
+
+    ``status`` moves from ``'loading'`` to ``'ready'`` (or ``'failed'``).
+    Callbacks registered with ``on_ready`` run on a background thread once the
+    model is available, so nothing on the page-rendering path ever waits for it.
+    """
+    
+    def __init__(self, factory: Callable[[], Any], name: str = 'model'):
+        self.factory = factory
+        self.name = name
+        self.model: Optional[Any] = None
+        self.status = 'loading'
+        self.error: Optional[Exception] = None
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[Any], None]] = []
+        self._thread = threading.Thread(target=self._load, name=f'{name}-loader', daemon=True)
+        self._thread.start()
+    
+    def _load(self):
+        """Build the model and run the registered callbacks"""
+        try:
+            model = self.factory()
+        except Exception as e:
+            logger.error(f"Error loading {self.name}: {e}")
+            with self._lock:
+                self.error = e
+                self.status = 'failed'
+            self._ready.set()
+            return
+        
+        with self._lock:
+            self.model = model
+            self.ready_at = time.time()
+            self.status = 'ready'
+            callbacks = list(self._callbacks)
+        self._ready.set()
+        logger.info(f"Loaded {self.name} in background in {self.ready_at - self.started_at:.2f}s")
+        for callback in callbacks:
+            self._run_callback(callback)
+    
+    def _run_callback(self, callback: Callable[[Any], None]):
+        """Run a ready callback, logging instead of raising"""
+        try:
+            callback(self.model)
+        except Exception as e:
+            logger.error(f"Error in {self.name} ready callback: {e}")
+    
+    def on_ready(self, callback: Callable[[Any], None]):
+        """Call callback with the model once loaded; runs on a background thread"""
+        with self._lock:
+            if self.status == 'loading':
+                self._callbacks.append(callback)
+                return
+            if self.status == 'failed':
+                return
+        threading.Thread(target=self._run_callback, args=(callback,), daemon=True).start()
+    
+    def is_ready(self) -> bool:
+        """Check whether the model has finished loading"""
+        return self.status == 'ready'
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Block until loading finishes and return the model (None if it failed or timed out)"""
+        self._ready.wait(timeout)
+        return self.model
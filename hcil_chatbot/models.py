@@ -0,0 +1,35 @@
+import logging
+from importlib import metadata
+from typing import TYPE_CHECKING
+
+from . import config
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+
+def get_model_version(model: 'SentenceTransformer') -> str:
+    """Get a version string that changes whenever cached embeddings become invalid"""
+    try:
+        library_version = metadata.version('sentence-transformers')
+    except metadata.PackageNotFoundError:
+        library_version = 'unknown'
+    version = f"sentence-transformers-{library_version}-dim{model.get_sentence_embedding_dimension()}"
+    # Alternative backends produce slightly different vectors, keep them apart in caches
+    version_tag = getattr(model, 'version_tag', None)
+    return f"{version}-{version_tag}" if version_tag else version
+
+
+def load_model() -> 'SentenceTransformer':
+    """Load the sentence encoder; imports torch or onnxruntime, so only call it off the render path"""
+    if config.ENCODER_BACKEND == 'onnx':
+        try:
+            from .onnx_encoder import OnnxEncoder
+            return OnnxEncoder.load_or_export(config.MODEL_NAME, config.ONNX_MODEL_DIR, quantize=config.ONNX_QUANTIZE)
+        except ImportError as e:
+            logger.warning(f"ONNX backend unavailable ({e}), falling back to PyTorch")
+    
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(config.MODEL_NAME)
@@ -0,0 +1,154 @@
+import inspect
+import json
+import logging
+import os
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'onnx_config.json'
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """Export a SentenceTransformer's transformer to ONNX, optionally int8-quantized
+
+    Only the transformer runs in ONNX Runtime; pooling and normalization are
+    done in NumPy by OnnxEncoder, as recorded in the exported config.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0]
+    # Older sentence-transformers spell the pooling config as flags, newer ones as a mode name
+    pooling = model[1].get_config_dict()
+    if not (pooling.get('pooling_mode') == 'mean' or pooling.get('pooling_mode_mean_tokens')):
+        raise ValueError(f"{model_name} does not use mean pooling, which OnnxEncoder implements")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(output_dir)
+    
+    sample = tokenizer(["export sample"], return_tensors='pt', padding=True)
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    
+    class HiddenStates(torch.nn.Module):
+        """Return only the token embeddings so the graph has one output"""
+        
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+        
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs)))[0]
+    
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles these models fine
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs['dynamo'] = False
+    
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            **export_kwargs
+        )
+    
+    model_file = 'model.onnx'
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(output_dir, 'model_int8.onnx'), weight_type=QuantType.QInt8)
+        model_file = 'model_int8.onnx'
+    
+    config = {
+        'model_name': model_name,
+        'model_file': model_file,
+        'quantized': quantize,
+        'input_names': input_names,
+        'max_seq_length': int(model.max_seq_length),
+        'normalize': any(type(module).__name__ == 'Normalize' for module in model),
+        'dimension': int(model.get_sentence_embedding_dimension())
+    }
+    with open(os.path.join(output_dir, CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    logger.info(f"Exported {model_name} to {os.path.join(output_dir, model_file)}")
+    return output_dir
+
+
+class OnnxEncoder:
+    """ONNX Runtime sentence encoder with the SentenceTransformer encode() interface"""
+    
+    def __init__(self, model_dir: str, num_threads: int = 0):
+        # The tokenizers package is enough at runtime, so neither torch nor transformers is imported
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        
+        with open(os.path.join(model_dir, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config['max_seq_length'])
+        self.tokenizer.enable_padding()
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.config['model_file']),
+            options,
+            providers=['CPUExecutionProvider']
+        )
+        # Included in cache keys so int8 vectors never mix with full-precision ones
+        self.version_tag = 'onnx-int8' if self.config['quantized'] else 'onnx'
+    
+    @classmethod
+    def load_or_export(cls, model_name: str, model_dir: str, quantize: bool = True) -> 'OnnxEncoder':
+        """Load an exported model, exporting it first if missing or built from another model"""
+        config_path = os.path.join(model_dir, CONFIG_FILE)
+        exported = False
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            exported = config.get('model_name') == model_name and config.get('quantized') == quantize
+        if not exported:
+            export_onnx(model_name, model_dir, quantize=quantize)
+        return cls(model_dir)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['dimension']
+    
+    def encode(self, sentences: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode sentences into mean-pooled (and normalized, if the model was) embeddings"""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        embeddings = np.empty((len(sentences), self.config['dimension']), dtype=np.float32)
+        
+        # Sorting by length keeps padding, and so wasted compute, low within a batch
+        order = np.argsort([len(sentence) for sentence in sentences], kind='stable')
+        for start in range(0, len(sentences), batch_size):
+            rows = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([sentences[i] for i in rows])
+            encoded = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            inputs = {name: encoded[name] for name in self.config['input_names']}
+            hidden = self.session.run(None, inputs)[0]
+            
+            mask = encoded['attention_mask'][:, :, np.newaxis].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.config['normalize']:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[rows] = pooled
+        return embeddings
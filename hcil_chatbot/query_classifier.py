@@ -0,0 +1,150 @@
+import re
+from typing import Callable, List, Optional, Tuple
+
+GREETING_THRESHOLD = 80
+
+_PUNCTUATION_ONLY = re.compile(r'[^\w\s]+')
+
+
+def load_partial_ratio() -> Callable[[str, str], int]:
+    """Get fuzz.partial_ratio, calling python-Levenshtein directly when fuzzywuzzy is backed by it
+
+    fuzzywuzzy wraps every comparison in StringMatcher objects, which costs
+    more than the comparisons themselves on short strings. The replacement
+    makes the same Levenshtein calls in the same order, so scores are identical.
+    """
+    from fuzzywuzzy import fuzz
+    try:
+        from Levenshtein import matching_blocks, opcodes, ratio
+    except ImportError:
+        # fuzzywuzzy falls back to difflib, whose blocks differ; keep its scorer
+        return fuzz.partial_ratio
+    
+    def partial_ratio(s1: str, s2: str) -> int:
+        if s1 == s2:
+            return 100
+        if not s1 or not s2:
+            return 0
+        shorter, longer = (s1, s2) if len(s1) <= len(s2) else (s2, s1)
+        scores = []
+        for short_start, long_start, _ in matching_blocks(opcodes(shorter, longer), shorter, longer):
+            start = max(long_start - short_start, 0)
+            score = ratio(shorter, longer[start:start + len(shorter)])
+            if score > .995:
+                return 100
+            scores.append(score)
+        return int(round(100 * max(scores)))
+    
+    return partial_ratio
+
+
+def load_upper_bound() -> Optional[Callable[..., float]]:
+    """Get rapidfuzz's partial_ratio, an upper bound on fuzzywuzzy's, if installed
+
+    Both score windows of the longer string by the same indel ratio, but
+    rapidfuzz finds the best window anywhere while fuzzywuzzy only tries windows
+    anchored at its matching blocks. python-Levenshtein >= 0.21 is built on
+    rapidfuzz, so it is normally present.
+    """
+    try:
+        from rapidfuzz import fuzz
+    except ImportError:
+        return None
+    return fuzz.partial_ratio
+
+
+def max_edits(length: int, threshold: int = GREETING_THRESHOLD) -> int:
+    """Get how many insertions plus deletions a window may need and still score above threshold
+
+    Windows are never longer than the string, and the ratio of a window with
+    ``common`` characters in common is ``2 * common / (length + window)``,
+    scored the way fuzzywuzzy rounds it.
+    """
+    edits = 0
+    for window in range(1, length + 1):
+        for common in range(min(length, window) + 1):
+            ratio = 2 * common / (length + window)
+            if ratio > .995 or int(round(100 * ratio)) > threshold:
+                edits = max(edits, length + window - 2 * common)
+    return edits
+
+
+def split_pieces(phrase: str, count: int) -> List[str]:
+    """Split a phrase into count contiguous, non-empty pieces of near-equal length"""
+    size, extra = divmod(len(phrase), count)
+    pieces, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        pieces.append(phrase[start:end])
+        start = end
+    return pieces
+
+
+class GreetingMatcher:
+    """Precompiled equivalent of ``fuzz.partial_ratio(greeting, text) > 80`` over a greeting list
+
+    For a text at least as long as a greeting, partial_ratio scores the greeting
+    against windows of the text no longer than the greeting. Scoring above 80 then
+    allows only a few inserted or deleted characters (``max_edits``), and
+    each edit can break only one of ``edits + 1`` contiguous pieces of the
+    greeting, so one piece must occur verbatim in the text. Every piece of every
+    greeting goes into a single compiled regex: texts it does not match cannot be
+    greetings. A text shorter than a greeting is the shorter side instead, so
+    the same argument applies with the roles swapped. Greetings whose pieces are
+    found are then bounded with rapidfuzz, when installed, and only the
+    survivors are scored exactly. Every filter only skips greetings that cannot
+    pass, so results are identical to the plain loop.
+    """
+    
+    def __init__(self, greetings: List[str]):
+        self.greetings = list(greetings)
+        self._pieces: List[Tuple[str, ...]] = []
+        for greeting in self.greetings:
+            self._pieces.append(tuple(split_pieces(greeting, max_edits(len(greeting)) + 1)))
+        
+        alternatives = sorted({piece for pieces in self._pieces for piece in pieces}, key=len, reverse=True)
+        self._any_piece = re.compile('|'.join(re.escape(piece) for piece in alternatives))
+        self._longest = max((len(greeting) for greeting in self.greetings), default=0)
+        self._short_text_edits = [max_edits(length) for length in range(self._longest)]
+        self._partial_ratio: Optional[Callable[[str, str], int]] = None
+        self._upper_bound: Optional[Callable[..., float]] = None
+    
+    def match(self, text: str) -> Optional[str]:
+        """Get the first greeting whose partial_ratio with text exceeds 80, if any"""
+        if not text:
+            return None
+        if len(text) >= self._longest and self._any_piece.search(text) is None:
+            return None
+        
+        # Only texts that pass the filter need the scorers, so load them on first use
+        if self._partial_ratio is None:
+            self._upper_bound = load_upper_bound()
+            self._partial_ratio = load_partial_ratio()
+        
+        text_pieces = split_pieces(text, self._short_text_edits[len(text)] + 1) if len(text) < self._longest else ()
+        for greeting, pieces in zip(self.greetings, self._pieces):
+            if len(text) >= len(greeting):
+                if not any(piece in text for piece in pieces):
+                    continue
+            elif not any(piece in greeting for piece in text_pieces):
+                continue
+            if self._upper_bound is not None and not self._upper_bound(greeting, text, score_cutoff=GREETING_THRESHOLD):
+                continue
+            if self._partial_ratio(greeting, text) > GREETING_THRESHOLD:
+                return greeting
+        return None
+
+
+def is_gibberish(text: str) -> bool:
+    """Check if text is too short, only punctuation, or mostly non-alphabetic words"""
+    text = text.strip()
+    if len(text) < 2:
+        return True
+    if _PUNCTUATION_ONLY.fullmatch(text):
+        return True
+    if len(set(text)) < 3:
+        return True
+    words = text.split()
+    if words and sum(1 for w in words if not w.isalpha()) / len(words) > 0.5:
+        return True
+    return False
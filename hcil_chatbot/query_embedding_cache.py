@@ -0,0 +1,108 @@
+import atexit
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query embeddings in front of an encoder
+
+    Queries are normalized (lowercased, whitespace collapsed; the encoder is
+    uncased and ignores spacing, so this never changes a vector) and keyed the
+    same way as the embedding store. Only texts missing from the cache reach
+    the wrapped encoder. With ``store`` set, entries are loaded at start and
+    written back every ``persist_every`` new entries and at exit, so common
+    phrasings survive restarts. Writes run on a background thread, never on
+    the thread answering a query.
+    """
+    
+    def __init__(self, encoder, store: EmbeddingStore, max_size: int = 10000,
+                 persist: bool = True, persist_every: int = 100):
+        self.encoder = encoder
+        self.store = store
+        self.persist = persist
+        self.persist_every = persist_every
+        self._cache = ResponseCache(max_size=max_size, ttl=float('inf'))
+        # _lock guards the counter only; _save_lock serializes the slow store rewrites
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._save_due = threading.Event()
+        if persist:
+            for key, vector in store.items():
+                self._cache.put(key, np.array(vector, dtype=np.float32))
+            if store.keys:
+                logger.info(f"Loaded {len(store.keys)} cached query embeddings")
+            threading.Thread(target=self._run_saver, name='query-embedding-saver', daemon=True).start()
+            atexit.register(self.save)
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize a query the way the cache keys it"""
+        return ' '.join(text.lower().split())
+    
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Encode texts, reusing cached vectors where possible"""
+        keys = [self.store.key(self.normalize(text)) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [self._cache.get(key) for key in keys]
+        
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = np.asarray(self.encoder.encode([self.normalize(texts[i]) for i in missing]), dtype=np.float32)
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+                self._cache.put(keys[i], vector)
+            self._note_unsaved(len(missing))
+        
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(vectors)
+    
+    def _note_unsaved(self, count: int):
+        """Wake the saver once enough new entries have accumulated"""
+        if not self.persist:
+            return
+        with self._lock:
+            self._unsaved += count
+            due = self._unsaved >= self.persist_every
+        if due:
+            self._save_due.set()
+    
+    def _run_saver(self):
+        """Persist whenever the cache asks for it, until the process exits"""
+        while True:
+            self._save_due.wait()
+            self._save_due.clear()
+            self.save()
+    
+    def save(self):
+        """Write the current cache contents to the store"""
+        if not self.persist:
+            return
+        with self._save_lock:
+            with self._lock:
+                unsaved, self._unsaved = self._unsaved, 0
+            if not unsaved:
+                return
+            entries = self._cache.items()
+            try:
+                if entries:
+                    self.store.write([key for key, _ in entries], np.stack([vector for _, vector in entries]))
+            except Exception as e:
+                with self._lock:
+                    self._unsaved += unsaved
+                logger.warning(f"Failed to persist query embeddings: {e}")
+                return
+        stats = self.stats()
+        logger.info(f"Query embedding cache saved: {stats['size']} entries, hit rate {stats['hit_rate']:.0%}")
+    
+    def stats(self) -> Dict[str, float]:
+        """Get hit, miss and size counters"""
+        return self._cache.stats()
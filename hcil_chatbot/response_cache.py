@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class ResponseCache:
+    """Bounded, thread-safe LRU cache with per-entry time-to-live
+
+    Entries are evicted least-recently-used first once ``max_size`` is reached,
+    and treated as missing once they are older than ``ttl`` seconds. Callers
+    include the knowledge base version in their keys; ``ensure_version`` drops
+    everything cached for an older version.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries if full"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def ensure_version(self, version: str):
+        """Clear the cache if it holds entries for a different knowledge base version"""
+        with self._lock:
+            if self.version != version:
+                self._entries.clear()
+                self.version = version
+    
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Get (key, value) pairs of live entries, least recently used first"""
+        with self._lock:
+            now = time.monotonic()
+            return [(key, value) for key, (value, stored_at) in self._entries.items()
+                    if now - stored_at <= self.ttl]
+    
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        """Get hit, miss and eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
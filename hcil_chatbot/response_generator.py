@@ -0,0 +1,187 @@
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+from . import config
+from .knowledge_base import EnhancedKnowledgeBase, KnowledgeBaseHolder, filter_scope
+from .query_classifier import GreetingMatcher, is_gibberish
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseGenerator:
+    """Enhanced response generation with context awareness"""
+    
+    def __init__(self, knowledge_base: Union[EnhancedKnowledgeBase, KnowledgeBaseHolder],
+                 cache: Optional[ResponseCache] = None, category: Optional[str] = None,
+                 tags: Optional[Sequence[str]] = None):
+        # A holder lets the generator follow knowledge base reloads
+        if not isinstance(knowledge_base, KnowledgeBaseHolder):
+            knowledge_base = KnowledgeBaseHolder(knowledge_base)
+        self.holder = knowledge_base
+        self.cache = cache
+        # Filters applied to queries that do not give their own
+        self.scope = filter_scope(category, tags)
+        self.greetings = {
+            "hello": "Hello! 👋 Welcome to HCIL IT Support. How may I assist you today?",
+            "hi": "Hi there! 🌟 Ready to help with your IT needs!",
+            "hey": "Hey! 💫 What can I help you with today?",
+            "greetings": "Greetings! 🎯 I'm here to assist with any IT issues.",
+            "good morning": "Good morning! ☀️ How can I brighten your day with IT solutions?",
+            "good afternoon": "Good afternoon! 🌤️ Ready to tackle any IT challenges!",
+            "good evening": "Good evening! 🌙 How may I assist you?",
+            "how are you": "I'm functioning optimally and ready to help! 🤖✨ What brings you here?",
+            "what's up": "Ready to solve IT problems! 💪 What's on your mind?",
+            "sup": "All systems operational! 🚀 How can I help?",
+            "thank you": "You're very welcome! 🙏 Happy to help anytime!",
+            "thanks": "My pleasure! ✨",
+            "bye": "Thank you for using HCIL IT Support! **Sayonara!** 👋✨",
+            "goodbye": "Until next time! **Mata ne!** 🌟 Have a great day!"
+        }
+        self.greeting_matcher = GreetingMatcher(list(self.greetings))
+    
+    @property
+    def kb(self) -> EnhancedKnowledgeBase:
+        """Get the live knowledge base"""
+        return self.holder.current
+    
+    def is_greeting(self, text: str) -> Optional[str]:
+        """Check if text is a greeting"""
+        return self.greeting_matcher.match(text.lower().strip())
+    
+    def is_gibberish(self, text: str) -> bool:
+        """Check if text is gibberish"""
+        return is_gibberish(text)
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query so trivially different spellings share a cache entry"""
+        return ' '.join(query.lower().split())
+    
+    def generate_response(self, query: str, context: List[Dict] = None, category: Optional[str] = None,
+                          tags: Optional[Sequence[str]] = None) -> Dict:
+        """Generate enhanced response, served from the shared cache when possible
+        
+        ``category`` and ``tags`` restrict the answer to matching entries and
+        override the generator's own filters when given.
+        """
+        start_time = time.time()
+        query = self.normalize_query(query)
+        scope = filter_scope(category, tags) if category or tags else self.scope
+        # One knowledge base answers the whole query, even if a reload swaps it meanwhile
+        kb = self.kb
+        
+        # The precomputed answers were searched with the configured filters
+        if scope == filter_scope(config.SEARCH_CATEGORY, config.SEARCH_TAGS):
+            precomputed = kb.precomputed_responses.get(query)
+            if precomputed is not None:
+                return {**precomputed, 'precomputed': True, 'processing_time': time.time() - start_time}
+        
+        # Responses do not depend on context yet, so the query and filters identify them.
+        # Fuzzy-only answers given while the model loads are not worth keeping.
+        cache_key = None
+        if self.cache is not None and kb.semantic_ready:
+            self.cache.ensure_version(kb.version)
+            cache_key = (kb.version, query) if scope == (None, ()) else (kb.version, query, scope)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return {**cached, 'cached': True, 'processing_time': time.time() - start_time}
+        
+        response = self._generate_response(query, context, start_time, kb, scope)
+        if cache_key is not None and response['method'] != 'error':
+            self.cache.put(cache_key, response)
+        return response
+    
+    def precompute(self, queries: List[str]) -> Dict[str, Dict]:
+        """Answer queries ahead of time, keyed by normalized query"""
+        table = {}
+        kb = self.kb
+        for query in queries:
+            normalized = self.normalize_query(query)
+            if normalized and normalized not in table:
+                response = self._generate_response(normalized, None, time.time(), kb, self.scope)
+                if response['method'] != 'error':
+                    table[normalized] = response
+        return table
+    
+    def _generate_response(self, query: str, context: List[Dict], start_time: float,
+                           kb: EnhancedKnowledgeBase, scope: tuple = (None, ())) -> Dict:
+        """Generate enhanced response with context awareness"""
+        try:
+            # Check for gibberish
+            if self.is_gibberish(query):
+                return {
+                    'response': "🤔 I couldn't quite understand that. Could you please rephrase your question?",
+                    'confidence': 0.0,
+                    'method': 'gibberish_detection',
+                    'processing_time': time.time() - start_time
+                }
+            
+            # Check for greetings
+            greeting = self.is_greeting(query)
+            if greeting:
+                return {
+                    'response': self.greetings[greeting],
+                    'confidence': 1.0,
+                    'method': 'greeting',
+                    'processing_time': time.time() - start_time
+                }
+            
+            # Search knowledge base
+            category, tags = scope
+            search_results = kb.search(query, method='hybrid', top_k=3, category=category, tags=tags)
+            
+            if not search_results:
+                return {
+                    'response': "🤔 I couldn't find a specific answer. Could you provide more details or try rephrasing?",
+                    'confidence': 0.0,
+                    'method': 'no_results',
+                    'processing_time': time.time() - start_time
+                }
+            
+            # Get best match
+            best_match = search_results[0]
+            
+            # Enhance response based on context
+            enhanced_response = self._enhance_response(best_match, context)
+            
+            return {
+                'response': enhanced_response,
+                'confidence': best_match['score'],
+                'method': best_match['method'],
+                'category': best_match['category'],
+                'tags': best_match['tags'],
+                'processing_time': time.time() - start_time,
+                'alternatives': search_results[1:] if len(search_results) > 1 else [],
+                'semantic_available': kb.semantic_ready
+            }
+        
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return {
+                'response': "😔 I encountered an error while processing your request. Please try again.",
+                'confidence': 0.0,
+                'method': 'error',
+                'processing_time': time.time() - start_time
+            }
+    
+    def _enhance_response(self, match: Dict, context: List[Dict] = None) -> str:
+        """Enhance response with additional context and formatting"""
+        try:
+            base_response = str(match['answer'])
+            
+            # Add category context if available
+            if match.get('category') and match['category'].strip():
+                category_info = f"\n\n**Category:** {match['category']}"
+                base_response += category_info
+            
+            # Add related tags if available
+            if match.get('tags') and match['tags'].strip():
+                tags_info = f"\n\n**Related:** {match['tags']}"
+                base_response += tags_info
+            
+            return base_response
+        except Exception as e:
+            logger.error(f"Error enhancing response: {e}")
+            return str(match.get('answer', ''))
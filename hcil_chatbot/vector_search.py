@@ -0,0 +1,256 @@
+import logging
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows of a float16 matrix upcast at a time while scoring, bounding the temporary float32 copy
+SCORE_CHUNK_ROWS = 8192
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving already-normalized float32 or float16 input untouched
+    
+    Keeping a memory-mapped float16 store as it is (instead of upcasting it)
+    is what lets processes share its pages.
+    """
+    vectors = np.asarray(vectors)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis, :]
+    norms = np.linalg.norm(vectors.astype(np.float32, copy=False), axis=1, keepdims=True)
+    tolerance = {np.dtype(np.float32): 1e-4, np.dtype(np.float16): 1e-2}.get(vectors.dtype)
+    if tolerance is not None and np.allclose(norms, 1.0, atol=tolerance):
+        return vectors
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class VectorIndex:
+    """Exact cosine-similarity search over L2-normalized embeddings
+
+    Embeddings are normalized once when the index is built, so a query costs one
+    matrix-vector product and an ``argpartition`` over the scores. Inputs that
+    are already unit-length float32 (such as a memory-mapped embedding store)
+    are used without copying.
+    """
+    
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = normalize_rows(embeddings)
+    
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+    
+    def subset(self, rows: np.ndarray) -> 'VectorIndex':
+        """Get an index over some rows, numbered by their position in ``rows``"""
+        index = self.__class__.__new__(self.__class__)
+        index.embeddings = np.asarray(self.embeddings[rows])
+        return index
+    
+    def search(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get row ids and cosine similarities of the top_k closest rows, best first"""
+        indices, scores = self.search_batch(query, top_k)
+        return indices[0], scores[0]
+    
+    def _score(self, queries: np.ndarray) -> np.ndarray:
+        """Get the similarity of every query to every row, as float32"""
+        if self.embeddings.dtype == np.float32:
+            return queries @ self.embeddings.T
+        scores = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            chunk = np.asarray(self.embeddings[start:start + SCORE_CHUNK_ROWS], dtype=np.float32)
+            scores[:, start:start + SCORE_CHUNK_ROWS] = queries @ chunk.T
+        return scores
+    
+    def search_batch(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search several queries with one matrix product, returning (n_queries, k) arrays"""
+        queries = normalize_rows(queries)
+        k = min(top_k, len(self))
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        
+        scores = self._score(queries)
+        if k < len(self):
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(len(self)), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        
+        # Only the k partitioned candidates need a full sort
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        indices = np.take_along_axis(candidates, order, axis=1)
+        return indices, np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class MultiFieldIndex(VectorIndex):
+    """Exact search scoring every row by a weighted sum of per-field cosine similarities
+    
+    With unit-length field vectors ``f_i`` and weights ``w_i``, the score
+    ``sum(w_i * q . f_i)`` equals ``q . sum(w_i * f_i)``, so the fields are
+    folded into one matrix when the index is built and a query still costs a
+    single matrix-vector product. Weights are scaled to sum to 1, keeping
+    scores in the cosine range.
+    """
+    
+    def __init__(self, fields: Sequence[np.ndarray], weights: Sequence[float]):
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Field weights must sum to a positive number")
+        combined = np.zeros(np.shape(fields[0]), dtype=np.float32)
+        for embeddings, weight in zip(fields, weights):
+            if weight:
+                combined += (weight / total) * normalize_rows(embeddings)
+        self.embeddings = combined
+
+
+class IVFIndex:
+    """Approximate cosine-similarity search with an inverted-file (IVF) index
+
+    Rows are clustered with spherical k-means into ``n_lists`` inverted lists.
+    A query is scored against the centroids first and then only against the
+    rows of its ``n_probe`` closest lists, so raising ``n_probe`` trades speed
+    for recall. With ``n_probe == n_lists`` the search is exact.
+    """
+    
+    def __init__(self, embeddings: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 8,
+                 train_iterations: int = 10, seed: int = 0):
+        self.embeddings = normalize_rows(embeddings)
+        if n_lists is None:
+            n_lists = max(1, int(4 * np.sqrt(len(self))))
+        self.n_lists = max(1, min(n_lists, len(self)))
+        self.n_probe = n_probe
+        self.centroids = np.empty((0, self.embeddings.shape[1]), dtype=np.float32)
+        self.list_offsets = np.zeros(1, dtype=np.int64)
+        self.list_rows = np.empty(0, dtype=np.int64)
+        if len(self):
+            self._train(train_iterations, seed)
+    
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+    
+    def subset(self, rows: np.ndarray) -> VectorIndex:
+        """Get an exact index over some rows; a slice is too small for its lists to pay off"""
+        return VectorIndex(self.embeddings[rows])
+    
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+        """Get the closest centroid of every vector, in chunks to bound memory"""
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+            assignments[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+    
+    def _train(self, iterations: int, seed: int):
+        """Cluster the rows with spherical k-means and build the inverted lists"""
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(self), max(self.n_lists * 64, 10_000))
+        sample = np.asarray(self.embeddings[np.sort(rng.choice(len(self), sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        
+        for _ in range(iterations):
+            assignments = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=self.n_lists)
+            
+            # Re-seed empty lists so every list keeps a share of the rows
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+        
+        assignments = self._assign(self.embeddings, centroids)
+        self.centroids = centroids.astype(np.float32)
+        self.list_rows = np.argsort(assignments, kind='stable')
+        self.list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=self.n_lists))))
+    
+    def search(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get row ids and cosine similarities of approximately the top_k closest rows"""
+        indices, scores = self.search_batch(query, top_k)
+        return indices[0], scores[0]
+    
+    def search_batch(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search several queries, returning (n_queries, k) arrays padded with -1 / -inf"""
+        queries = normalize_rows(queries)
+        k = min(top_k, len(self))
+        indices = np.full((queries.shape[0], max(k, 0)), -1, dtype=np.int64)
+        scores = np.full((queries.shape[0], max(k, 0)), -np.inf, dtype=np.float32)
+        if k <= 0:
+            return indices, scores
+        
+        n_probe = min(self.n_probe, self.n_lists)
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        
+        for i, (query, lists) in enumerate(zip(queries, probes)):
+            rows = np.concatenate([self.list_rows[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists])
+            row_scores = np.asarray(self.embeddings[rows], dtype=np.float32) @ query
+            count = min(k, len(rows))
+            if count < len(rows):
+                best = np.argpartition(-row_scores, count - 1)[:count]
+            else:
+                best = np.arange(len(rows))
+            best = best[np.argsort(-row_scores[best], kind='stable')]
+            indices[i, :count] = rows[best]
+            scores[i, :count] = row_scores[best]
+        return indices, scores
+    
+    def save(self, path: str, fingerprint: str = ''):
+        """Persist the trained lists; the embeddings themselves stay in their own store"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_rows=self.list_rows,
+            fingerprint=np.array(fingerprint)
+        )
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str, embeddings: np.ndarray, n_probe: int = 8,
+             fingerprint: str = '') -> Optional['IVFIndex']:
+        """Load persisted lists for embeddings, or None if missing or built from other rows"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['fingerprint']) != fingerprint:
+                    return None
+                index = cls.__new__(cls)
+                index.embeddings = normalize_rows(embeddings)
+                index.centroids = data['centroids']
+                index.list_offsets = data['list_offsets']
+                index.list_rows = data['list_rows']
+        except Exception as e:
+            logger.warning(f"Failed to load IVF index {path}: {e}")
+            return None
+        if int(index.list_offsets[-1]) != len(index):
+            return None
+        index.n_lists = len(index.centroids)
+        index.n_probe = n_probe
+        return index
+
+
+def build_index(embeddings: np.ndarray, backend: str = 'exact', cache_path: Optional[str] = None,
+                fingerprint: str = '', **params):
+    """Build (or load from cache_path) the search index for a backend name"""
+    if backend == 'exact':
+        return VectorIndex(embeddings)
+    if backend == 'ivf':
+        n_probe = params.get('n_probe', 8)
+        if cache_path:
+            index = IVFIndex.load(cache_path, embeddings, n_probe=n_probe, fingerprint=fingerprint)
+            if index is not None and (params.get('n_lists') is None or index.n_lists == params['n_lists']):
+                logger.info(f"Loaded IVF index with {index.n_lists} lists from cache")
+                return index
+        index = IVFIndex(embeddings, n_lists=params.get('n_lists'), n_probe=n_probe)
+        if cache_path:
+            try:
+                index.save(cache_path, fingerprint=fingerprint)
+            except Exception as e:
+                logger.warning(f"Failed to cache IVF index: {e}")
+        return index
+    raise ValueError(f"Unknown index backend: {backend}")
@@ -0,0 +1,59 @@
+import logging
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FileWatcher:
+    """Poll a file and call back once it has changed and stopped changing
+
+    A change is noticed from the file's modification time and size. The
+    callback only runs after the file looked the same on two consecutive
+    polls, so a spreadsheet that is still being saved is not read half
+    written. Polling needs no extra dependency and works on network shares,
+    where change notifications are unreliable.
+    """
+    
+    def __init__(self, path: str, callback: Callable[[], None], interval: float = 2.0):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='file-watcher', daemon=True)
+        self._thread.start()
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of the file, or None if it is missing"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _run(self):
+        """Watch until stopped"""
+        pending = None
+        while not self._stop.wait(self.interval):
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                pending = None
+                continue
+            if signature != pending:
+                # Changed since the last poll; wait for it to settle
+                pending = signature
+                continue
+            self._signature = signature
+            pending = None
+            logger.info(f"Detected change to {self.path}")
+            try:
+                self.callback()
+            except Exception as e:
+                logger.error(f"Error handling change to {self.path}: {e}")
+    
+    def stop(self):
+        """Stop watching"""
+        self._stop.set()
+        self._thread.join()